@@ -0,0 +1,900 @@
+import os
+import ssl
+import json
+import uuid
+import time
+import random
+import threading
+import asyncio
+import requests
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+import Report
+
+################################################################################
+# API CLIENT
+################################################################################
+
+# One client for every create and purge path: a pooled keep-alive session,
+# explicit connect/read timeouts on every call, and retries with jittered
+# exponential backoff for calls that are safe to repeat.
+
+# Base URL of the backend. Overridable per run (--base-url) or per host
+# through the DATASCRIPTS_BASE_URL environment variable.
+DEFAULT_BASE_URL = os.environ.get("DATASCRIPTS_BASE_URL", "http://3.17.219.54").rstrip("/")
+
+# (connect, read) timeouts in seconds. Uploads get a longer read timeout since
+# the server may take a while to store a multi-GB video before answering.
+DEFAULT_TIMEOUT = (10, 60)
+UPLOAD_TIMEOUT = (10, 600)
+
+# Attempts after the first one, and the backoff curve between them.
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# A Retry-After longer than this is capped, so a bad header cannot stall a run.
+RETRY_AFTER_MAX = 120.0
+
+# Statuses worth retrying. Idempotent calls (GET, DELETE) retry any transient
+# server error; creates only retry statuses where the backend did not act on
+# the request (rate limited, proxy could not reach it, or unavailable).
+RETRY_STATUSES_IDEMPOTENT = frozenset([429, 500, 502, 503, 504])
+RETRY_STATUSES_CREATE = frozenset([429, 502, 503])
+
+# Size of the pieces read from disk while streaming a file upload.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class ApiClient:
+    """
+    Thin wrapper around a requests.Session shared by all worker threads.
+
+    'pool_size' is the number of keep-alive connections kept open; set it to
+    the number of concurrent workers. Paths are joined to 'base_url'; absolute
+    URLs (e.g. pagination links) are used as they are. With 'metrics' (a
+    Metrics.RunMetrics), every request is recorded there. With 'limiter' (an
+    AimdController), every attempt waits for a slot and reports back to it.
+    Creates and deletes under a base URL given to use_endpoints() are spread
+    over its replicas.
+    """
+
+    def __init__(self, base_url=None, pool_size=10, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, metrics=None, limiter=None):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.metrics = metrics
+        self.limiter = limiter
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        # Retries are handled here, where the body can be rebuilt per attempt.
+        # One connection pool per host, replicas included.
+        hosts = 1 + sum(len(pool.urls) for pool in _endpoint_pools.values())
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=max(1, pool_size), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, idempotent, timeout=None, body_factory=None, **kwargs):
+        """
+        Sends one request, retrying transient failures with jittered
+        exponential backoff (honoring Retry-After).
+
+        'idempotent' selects the retry policy: idempotent calls are retried on
+        any connection error, timeout or RETRY_STATUSES_IDEMPOTENT; others
+        only when the request never reached the server or on
+        RETRY_STATUSES_CREATE. 'body_factory', if given, is called for every
+        attempt and must return a fresh (closeable) body, so a streamed
+        upload is re-read from the start. The final response is returned;
+        the final exception, if every attempt failed, is raised.
+        """
+        url = self.url(path)
+        endpoints = endpoint_pool(url) if method in BALANCED_METHODS else None
+        retry_statuses = RETRY_STATUSES_IDEMPOTENT if idempotent else RETRY_STATUSES_CREATE
+        attempt = 0
+        started = time.perf_counter()
+        sent = 0
+        outcome = None
+        try:
+            while True:
+                body = body_factory() if body_factory is not None else None
+                if self.limiter is not None:
+                    self.limiter.acquire()
+                endpoint = endpoints.acquire() if endpoints is not None else None
+                attempt_started = time.perf_counter()
+                signal = None
+                try:
+                    if body is not None:
+                        kwargs["data"] = body
+                        headers = dict(kwargs.get("headers") or {})
+                        headers["Content-Type"] = body.content_type
+                        kwargs["headers"] = headers
+                    target = url if endpoint is None else endpoints.route(endpoint, url)
+                    response = self.session.request(method, target, timeout=timeout or self.timeout, **kwargs)
+                    signal = response
+                except requests.RequestException as e:
+                    signal = e
+                    if not _never_sent(e):
+                        sent += _body_size(e.request)
+                    if attempt >= self.retries or not (idempotent or _never_sent(e)):
+                        outcome = type(e).__name__
+                        raise
+                    delay = self._backoff(attempt)
+                else:
+                    sent += _body_size(response.request)
+                    if attempt >= self.retries or response.status_code not in retry_statuses:
+                        outcome = response.status_code
+                        return response
+                    delay = max(self._backoff(attempt), _retry_after(response))
+                    response.close()
+                finally:
+                    if body is not None:
+                        body.close()
+                    if self.limiter is not None:
+                        self.limiter.release(time.perf_counter() - attempt_started, signal,
+                                             len(body) if body is not None else 0)
+                    if endpoint is not None:
+                        endpoints.release(endpoint, signal)
+                attempt += 1
+                time.sleep(delay)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_request(method, outcome or "interrupted", started, sent, attempt + 1)
+
+    def _backoff(self, attempt):
+        # "Full jitter": spreads retries from many workers over the window.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, idempotent=True, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, idempotent=True, **kwargs)
+
+    def post_json(self, path, payload, **kwargs):
+        return self.request("POST", path, idempotent=False, json=payload, **kwargs)
+
+    def post_multipart(self, path, parts, timeout=UPLOAD_TIMEOUT, **kwargs):
+        """
+        POSTs 'parts' (see StreamingMultipartEncoder) as a streamed
+        multipart/form-data body. Every file handle is closed before this
+        returns, including on retries.
+        """
+        return self.request("POST", path, idempotent=False, timeout=timeout,
+                            body_factory=lambda: StreamingMultipartEncoder(parts), **kwargs)
+
+def _never_sent(exc):
+    """
+    True if the request certainly did not reach the server (the connection
+    could not be opened), so even a create is safe to send again.
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+def _body_size(prepared):
+    """
+    Bytes of the body of a sent requests.PreparedRequest (0 if unknown).
+    """
+    body = getattr(prepared, "body", None)
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+def _retry_after(response):
+    """
+    Seconds requested by a Retry-After header (delta or HTTP date), or 0.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+################################################################################
+# ADAPTIVE CONCURRENCY
+################################################################################
+
+# AIMD (additive increase, multiplicative decrease) control of the number of
+# requests in flight, as in TCP congestion control. Every finished attempt is
+# a signal: while responses come back fast and clean the limit grows by about
+# one per round of requests; a 429, a 5xx, a connection error or a latency
+# spike cuts it by ADAPTIVE_DECREASE, and a Retry-After holds every new
+# request back until it has passed.
+
+# Level the limit starts from, unless told otherwise.
+ADAPTIVE_INITIAL = 4
+
+# Factor the limit is multiplied by on an overload signal.
+ADAPTIVE_DECREASE = 0.5
+
+# An attempt slower than this many times the baseline latency is a spike.
+ADAPTIVE_SPIKE_FACTOR = 2.5
+
+# Clean attempts needed before latency spikes are trusted as a signal.
+ADAPTIVE_WARMUP = 10
+
+# Latency is measured per this many bytes of request body, so a large upload
+# is not mistaken for a slow backend.
+ADAPTIVE_SIZE_UNIT = 1024 * 1024
+
+class AimdController:
+    """
+    Thread-safe AIMD limit on requests in flight, shared by every worker of a
+    run. ApiClient and AsyncApiClient call it around each attempt when given
+    one as 'limiter'; acquire() blocks while the limit is reached or a
+    Retry-After hold is active.
+
+    'limit' is the current level (between 'minimum' and 'maximum');
+    'lowest' / 'highest' are the extremes it reached during the run.
+    """
+
+    def __init__(self, initial=ADAPTIVE_INITIAL, minimum=1, maximum=64):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self.lowest = self.highest = self.limit
+        self.in_flight = 0
+        self.decreases = 0
+        self._baseline = None      # slowly rising minimum of normalised latency
+        self._smoothed = None      # EWMA of latency, paces decreases
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._hold_until = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def try_acquire(self):
+        """
+        Takes a slot if one is free. Returns None on success, else the
+        longest time worth waiting before trying again.
+        """
+        with self._cond:
+            return self._try_acquire_locked()
+
+    def _try_acquire_locked(self):
+        hold = self._hold_until - time.monotonic()
+        if hold > 0:
+            return hold
+        if self.in_flight >= self.limit:
+            return 1.0
+        self.in_flight += 1
+        return None
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait_time = self._try_acquire_locked()
+                if wait_time is None:
+                    return
+                self._cond.wait(wait_time)
+
+    def release(self, latency, outcome, size=0):
+        """
+        Frees a slot and adjusts the limit. 'outcome' is the response (or
+        AsyncResponse), the exception the attempt raised, or None if it was
+        interrupted; 'size' is the request body size in bytes.
+        """
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            status = getattr(outcome, "status_code", None)
+            if outcome is None:
+                pass
+            elif isinstance(outcome, BaseException) or status == 429 or status >= 500:
+                if status is not None:
+                    retry_after = _retry_after(outcome)
+                    if retry_after:
+                        self._hold_until = max(self._hold_until, now + retry_after)
+                self._decrease(now)
+            else:
+                signal = latency / max(1.0, size / ADAPTIVE_SIZE_UNIT)
+                self._smoothed = latency if self._smoothed is None else 0.8 * self._smoothed + 0.2 * latency
+                spike = (self._samples >= ADAPTIVE_WARMUP
+                         and signal > self._baseline * ADAPTIVE_SPIKE_FACTOR)
+                if self._baseline is None or signal < self._baseline:
+                    self._baseline = signal
+                else:
+                    # Drift up slowly, so a lasting change becomes the new normal.
+                    self._baseline += (signal - self._baseline) * 0.01
+                self._samples += 1
+                if spike:
+                    self._decrease(now)
+                else:
+                    self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+                    self.highest = max(self.highest, self.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, now):
+        # Signals from requests already in flight when the limit was cut
+        # describe the old level; cut at most once per smoothed latency.
+        if now - self._last_decrease < (self._smoothed or 0.0):
+            return
+        self._last_decrease = now
+        self._limit = max(self.minimum, self._limit * ADAPTIVE_DECREASE)
+        self.lowest = min(self.lowest, self.limit)
+        self.decreases += 1
+
+    def describe(self):
+        return (f"concurrency now {self.limit} (range {self.lowest}-{self.highest}, "
+                f"{self.decreases} cut(s) on overload)")
+
+################################################################################
+# LOAD BALANCING
+################################################################################
+
+# The backend can run as several replicas with no load balancer in front.
+# Given all of them (--base-url URL,URL,...), every create and delete attempt
+# goes to the healthy replica with the fewest requests in flight (least
+# outstanding requests), so a slow replica gets less work. A replica that
+# fails EJECT_AFTER attempts in a row (connection error or 5xx) is ejected.
+# A background health check then GETs its health path, waiting EJECT_SECONDS
+# at first and doubling up to EJECT_MAX_SECONDS, and readmits it once it
+# answers below 500.
+#
+# Replicas serve the same API, so any URL under the first (primary) base URL
+# can go to any of them: ApiClient and AsyncApiClient swap the primary prefix
+# for the chosen replica on each attempt, and a retry may land elsewhere.
+# Listings (GET) stay on the primary, so pagination links, ETags and the
+# listing cache keep referring to one server.
+
+# Consecutive failed attempts that eject a replica.
+EJECT_AFTER = 3
+
+# Seconds before an ejected replica is first probed, and the longest wait
+# between two probes.
+EJECT_SECONDS = 5.0
+EJECT_MAX_SECONDS = 60.0
+
+# (connect, read) timeouts of a health check.
+HEALTH_TIMEOUT = (3, 5)
+
+# Methods spread over the replicas.
+BALANCED_METHODS = frozenset(["POST", "DELETE"])
+
+# Primary base URL -> EndpointPool, filled by use_endpoints().
+_endpoint_pools = {}
+
+class EndpointPool:
+    """
+    Thread-safe least-outstanding-requests balancer over 'urls', the base
+    URLs of replicas of one backend (the first is the primary). acquire()
+    picks the replica for an attempt and release() reports how it went.
+    Counts per replica are kept for describe().
+    """
+
+    def __init__(self, urls, health_path="", eject_after=EJECT_AFTER, eject_seconds=EJECT_SECONDS):
+        self.urls = list(dict.fromkeys(url.rstrip("/") for url in urls))
+        self.primary = self.urls[0]
+        self.health_path = health_path.lstrip("/")
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+        self._stats = {url: {"in_flight": 0, "requests": 0, "failures": 0, "streak": 0,
+                             "ejected": False, "ejections": 0} for url in self.urls}
+
+    def route(self, endpoint, url):
+        """
+        'url' (under the primary base URL) rewritten to go to 'endpoint'.
+        """
+        return endpoint + url[len(self.primary):]
+
+    def acquire(self):
+        with self._lock:
+            # With every replica ejected, keep trying them rather than failing.
+            candidates = [url for url in self.urls if not self._stats[url]["ejected"]] or self.urls
+            endpoint = min(candidates,
+                           key=lambda url: (self._stats[url]["in_flight"], self._stats[url]["requests"]))
+            stats = self._stats[endpoint]
+            stats["in_flight"] += 1
+            stats["requests"] += 1
+            return endpoint
+
+    def release(self, endpoint, outcome):
+        """
+        Frees the slot taken on 'endpoint'. 'outcome' is the response (or
+        AsyncResponse), the exception the attempt raised, or None if it was
+        interrupted.
+        """
+        status = getattr(outcome, "status_code", None)
+        eject = False
+        with self._lock:
+            stats = self._stats[endpoint]
+            stats["in_flight"] = max(0, stats["in_flight"] - 1)
+            if outcome is None:
+                return
+            if isinstance(outcome, BaseException) or status >= 500:
+                stats["failures"] += 1
+                stats["streak"] += 1
+                eject = stats["streak"] >= self.eject_after and not stats["ejected"]
+                if eject:
+                    stats["ejected"] = True
+                    stats["ejections"] += 1
+            else:
+                stats["streak"] = 0
+                stats["ejected"] = False
+        if eject:
+            reason = type(outcome).__name__ if status is None else f"HTTP {status}"
+            self._eject(endpoint, f"{self.eject_after} failures in a row, last: {reason}")
+
+    def _eject(self, endpoint, reason):
+        Report.warning(f"Warning: replica {endpoint} ejected ({reason}); "
+                       f"health-checking it every {self.eject_seconds:g}s or more.")
+        threading.Thread(target=self._probe, args=(endpoint,), daemon=True).start()
+
+    def _probe(self, endpoint):
+        delay = self.eject_seconds
+        while True:
+            time.sleep(delay)
+            with self._lock:
+                if not self._stats[endpoint]["ejected"]:
+                    return  # a request got through in the meantime
+            if self.check(endpoint):
+                with self._lock:
+                    self._stats[endpoint]["ejected"] = False
+                    self._stats[endpoint]["streak"] = 0
+                Report.info(f"Replica {endpoint} is healthy again.")
+                return
+            delay = min(EJECT_MAX_SECONDS, delay * 2)
+
+    def check(self, endpoint):
+        """
+        Health check: True if 'endpoint' answers a GET of the health path
+        with a status below 500.
+        """
+        try:
+            response = requests.get(f"{endpoint}/{self.health_path}", timeout=HEALTH_TIMEOUT)
+            response.close()
+        except requests.RequestException:
+            return False
+        return response.status_code < 500
+
+    def check_all(self):
+        """
+        Health-checks every replica at once and ejects those that fail.
+        """
+        results = {}
+
+        def check(url):
+            results[url] = self.check(url)
+
+        threads = [threading.Thread(target=check, args=(url,)) for url in self.urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for url in self.urls:
+            if not results.get(url):
+                with self._lock:
+                    self._stats[url]["ejected"] = True
+                    self._stats[url]["ejections"] += 1
+                self._eject(url, "failed its health check")
+
+    def describe(self):
+        lines = []
+        for url in self.urls:
+            stats = self._stats[url]
+            line = f"{url}: {stats['requests']} request(s), {stats['failures']} failed"
+            if stats["ejections"]:
+                line += f", ejected {stats['ejections']} time(s)"
+            if stats["ejected"]:
+                line += ", still ejected"
+            lines.append(line)
+        return lines
+
+def use_endpoints(urls, health_path=""):
+    """
+    From now on, spreads creates and deletes sent under the first of 'urls'
+    over all of them (see above). Health-checks every replica first and
+    returns the EndpointPool.
+    """
+    pool = EndpointPool(urls, health_path)
+    pool.check_all()
+    _endpoint_pools[pool.primary] = pool
+    return pool
+
+def endpoint_pool(url):
+    """
+    The EndpointPool whose primary base URL 'url' falls under, or None.
+    """
+    for primary, pool in _endpoint_pools.items():
+        if url == primary or url.startswith(primary + "/"):
+            return pool
+    return None
+
+################################################################################
+# STREAMING MULTIPART UPLOADS
+################################################################################
+
+class StreamingMultipartEncoder:
+    """
+    A multipart/form-data body that is generated while it is being sent.
+
+    'parts' is a list of (name, filename, source, content_type) tuples, in the
+    same shape as the values requests accepts in 'files='. For a file part,
+    'filename' is set and 'source' is a path on disk; for a plain field,
+    'filename' is None and 'source' is the str/bytes value.
+
+    Files are opened only when their turn comes, read in UPLOAD_CHUNK_SIZE
+    pieces and closed as soon as they are exhausted (or when the encoder is
+    closed), so memory use stays constant whatever the file size. The total
+    length is computed up front, so requests sends a Content-Length header.
+    Use it as a context manager, or call close(), to release any open file.
+    """
+
+    def __init__(self, parts):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+        self._parts = []  # (header bytes, value bytes or None, path or None, size)
+        length = 0
+        for name, filename, source, content_type in parts:
+            disposition = f'form-data; name="{_quote_header_value(name)}"'
+            if filename is not None:
+                disposition += f'; filename="{_quote_header_value(filename)}"'
+            header = (
+                f"--{self.boundary}\r\n"
+                f"Content-Disposition: {disposition}\r\n"
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode("utf-8")
+
+            if filename is not None:
+                size = os.path.getsize(source)
+                self._parts.append((header, None, source, size))
+            else:
+                value = source.encode("utf-8") if isinstance(source, str) else source
+                size = len(value)
+                self._parts.append((header, value, None, size))
+            length += len(header) + size + 2  # trailing CRLF after each part
+
+        self._closing = f"--{self.boundary}--\r\n".encode("utf-8")
+        self._length = length + len(self._closing)
+
+        self._chunks = self._generate()
+        self._buffer = b""
+        self._offset = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _generate(self):
+        for header, value, path, size in self._parts:
+            yield header
+            if path is None:
+                yield value
+            else:
+                remaining = size
+                with open(path, 'rb') as fh:
+                    while remaining > 0:
+                        chunk = fh.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            raise IOError(f"'{path}' shrank while it was being uploaded.")
+                        remaining -= len(chunk)
+                        yield chunk
+            yield b"\r\n"
+        yield self._closing
+
+    def read(self, size=-1):
+        """
+        File-like read used by the HTTP layer to pull the body piece by piece.
+        """
+        if size is None or size < 0:
+            size = self._length
+        pieces = []
+        wanted = size
+        while wanted > 0:
+            if self._offset >= len(self._buffer):
+                self._buffer = next(self._chunks, b"")
+                self._offset = 0
+                if not self._buffer:
+                    break
+            piece = self._buffer[self._offset:self._offset + wanted]
+            self._offset += len(piece)
+            wanted -= len(piece)
+            pieces.append(piece)
+        return b"".join(pieces)
+
+    def close(self):
+        # Closing the generator runs its 'with' block, closing any open file.
+        self._chunks.close()
+        self._buffer = b""
+        self._offset = 0
+
+def _quote_header_value(value):
+    """
+    Escapes a name/filename for use inside a quoted Content-Disposition
+    parameter, the same way browsers do.
+    """
+    return value.replace('\\', '\\\\').replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+################################################################################
+# ASYNC API CLIENT
+################################################################################
+
+# Requests kept in flight by AsyncApiClient unless told otherwise. Each one
+# holds its own keep-alive connection (HTTP/1.1 has no multiplexing).
+DEFAULT_ASYNC_CONCURRENCY = 100
+
+class AsyncResponse:
+    """
+    The parts of an HTTP response the create paths look at.
+    """
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = body
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+class _NeverSent(Exception):
+    """
+    The connection failed before the server could have seen the request.
+    """
+
+class AsyncApiClient:
+    """
+    Minimal asyncio HTTP/1.1 client for high volumes of small JSON requests,
+    built on asyncio streams so it needs nothing beyond the standard library.
+
+    At most 'concurrency' requests are in flight, each over its own pooled
+    keep-alive connection. Timeouts, retries, 'metrics' and 'limiter' follow
+    the same rules as ApiClient (see ApiClient.request); with a limiter,
+    'concurrency' is the ceiling and the limiter decides the actual level.
+    As with ApiClient, creates under a base URL given to use_endpoints() are
+    spread over its replicas, with idle connections kept per replica.
+    """
+
+    def __init__(self, base_url=None, concurrency=DEFAULT_ASYNC_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, metrics=None,
+                 limiter=None):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.endpoints = endpoint_pool(self.base_url)
+        self._targets = {}  # base URL -> (host, port, ssl context, Host header, path prefix)
+
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+        self.limiter = limiter
+        self._limiter_changed = None  # asyncio.Condition, created inside the loop
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._idle = {}  # base URL -> [(reader, writer)] keep-alive connections
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        idle = [connection for connections in self._idle.values() for connection in connections]
+        self._idle = {}
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def post_json(self, path, payload):
+        body = json.dumps(payload).encode("utf-8")
+        return await self.request("POST", path, body, idempotent=False)
+
+    async def request(self, method, path, body=b"", idempotent=False):
+        """
+        Sends one request with retries and returns an AsyncResponse. The
+        final exception is raised if every attempt failed.
+        """
+        retry_statuses = RETRY_STATUSES_IDEMPOTENT if idempotent else RETRY_STATUSES_CREATE
+        attempt = 0
+        async with self._slots:
+            started = time.perf_counter()
+            sent = 0
+            outcome = None
+            try:
+                while True:
+                    await self._limiter_acquire()
+                    endpoint = None
+                    if self.endpoints is not None and method in BALANCED_METHODS:
+                        endpoint = self.endpoints.acquire()
+                    attempt_started = time.perf_counter()
+                    signal = None
+                    try:
+                        base_url = (self.base_url if endpoint is None
+                                    else self.endpoints.route(endpoint, self.base_url))
+                        response = await self._send(method, path, body, base_url)
+                        signal = response
+                    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError,
+                            _NeverSent) as e:
+                        signal = e
+                        if not isinstance(e, _NeverSent):
+                            sent += len(body)
+                        if attempt >= self.retries or not (idempotent or isinstance(e, _NeverSent)):
+                            outcome = type(e).__name__
+                            raise
+                        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                    else:
+                        sent += len(body)
+                        if attempt >= self.retries or response.status_code not in retry_statuses:
+                            outcome = response.status_code
+                            return response
+                        delay = max(random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))),
+                                    _retry_after(response))
+                    finally:
+                        if endpoint is not None:
+                            self.endpoints.release(endpoint, signal)
+                        await self._limiter_release(time.perf_counter() - attempt_started, signal, len(body))
+                    attempt += 1
+                    await asyncio.sleep(delay)
+            finally:
+                if self.metrics is not None:
+                    self.metrics.record_request(method, outcome or "interrupted", started, sent, attempt + 1)
+
+    async def _limiter_acquire(self):
+        if self.limiter is None:
+            return
+        if self._limiter_changed is None:
+            self._limiter_changed = asyncio.Condition()
+        async with self._limiter_changed:
+            while True:
+                wait_time = self.limiter.try_acquire()
+                if wait_time is None:
+                    return
+                try:
+                    await asyncio.wait_for(self._limiter_changed.wait(), wait_time)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _limiter_release(self, latency, outcome, size):
+        if self.limiter is None:
+            return
+        self.limiter.release(latency, outcome, size)
+        async with self._limiter_changed:
+            self._limiter_changed.notify_all()
+
+    def _target(self, base_url):
+        target = self._targets.get(base_url)
+        if target is None:
+            parts = urlsplit(base_url)
+            target = (parts.hostname, parts.port or (443 if parts.scheme == "https" else 80),
+                      ssl.create_default_context() if parts.scheme == "https" else None,
+                      parts.netloc, parts.path.rstrip("/"))
+            self._targets[base_url] = target
+        return target
+
+    async def _connect(self, host, port, ssl_context):
+        connect_timeout, _ = self.timeout
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context,
+                                        server_hostname=host if ssl_context else None),
+                connect_timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise _NeverSent(f"Could not connect to {host}:{port}: {e!r}") from e
+
+    async def _send(self, method, path, body, base_url):
+        _, read_timeout = self.timeout
+        host, port, ssl_context, host_header, path_prefix = self._target(base_url)
+        idle = self._idle.setdefault(base_url, [])
+        reused = bool(idle)
+        reader, writer = idle.pop() if reused else await self._connect(host, port, ssl_context)
+
+        head = (f"{method} {path_prefix}/{path.lstrip('/')} HTTP/1.1\r\n"
+                f"Host: {host_header}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n\r\n").encode("latin-1")
+        keep = False
+        try:
+            writer.write(head + body)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), read_timeout)
+            if not status_line:
+                # A reused connection the server had already closed: the
+                # request was never read, so it is safe to send again.
+                if reused:
+                    raise _NeverSent("Keep-alive connection closed by the server.")
+                raise ConnectionError("Connection closed before a response was received.")
+            response, keep = await asyncio.wait_for(self._read_response(status_line, reader), read_timeout)
+            return response
+        except (ConnectionResetError, BrokenPipeError) as e:
+            if reused:
+                raise _NeverSent(str(e)) from e
+            raise
+        finally:
+            if keep:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+
+    @staticmethod
+    async def _read_response(status_line, reader):
+        """
+        Parses status line, headers and body. Returns (response, keep_alive).
+        """
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError(f"Malformed status line: {status_line!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().title()] = value.strip()
+
+        keep_alive = headers.get("Connection", "").lower() != "close" and parts[0] != "HTTP/1.0"
+        if headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the terminating blank line.
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "Content-Length" in headers:
+            body = await reader.readexactly(int(headers["Content-Length"]))
+        elif status in (204, 304) or status < 200:
+            body = b""
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return AsyncResponse(status, headers, body), keep_alive
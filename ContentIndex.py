@@ -0,0 +1,158 @@
+import os
+import json
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from Storage import write_atomic
+
+################################################################################
+# CONTENT INDEX
+################################################################################
+
+# Local record of which file contents (by SHA-256) were already uploaded, and
+# the server id they were created under. Shared by every run on this machine,
+# so the same video or icon is not sent twice even from different folders.
+#
+#   {
+#     "hashes":  {abs path: [size, mtime_ns, sha256]},   # avoids re-hashing
+#     "uploads": {kind: {sha256: {"id": server id, "name": item name}}}
+#   }
+
+INDEX_PATH = os.path.join(os.path.expanduser("~"), ".datascripts", "content_index.json")
+
+# Threads hashing files at once. hashlib releases the GIL on large buffers,
+# so hashing several files in parallel scales with disk throughput.
+DEFAULT_HASH_WORKERS = 4
+
+# Size of the slices of a memory-mapped file handed to the hash at a time.
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+def load_index(path=INDEX_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.loads(f.read())
+    except (OSError, ValueError):
+        index = {}
+    if not isinstance(index, dict):
+        index = {}
+    index.setdefault("hashes", {})
+    index.setdefault("uploads", {})
+    return index
+
+def save_index(index, path=INDEX_PATH):
+    write_atomic(path, json.dumps(index), "content index")
+
+def hash_file(path):
+    """
+    SHA-256 of a file, read through a memory map instead of Python-level
+    buffered reads.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for start in range(0, len(mapped), HASH_BLOCK_SIZE):
+                    digest.update(view[start:start + HASH_BLOCK_SIZE])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+def hash_files(paths, index, workers=DEFAULT_HASH_WORKERS):
+    """
+    Returns the SHA-256 of every path, in order (None for unreadable files).
+    Files whose size and mtime match index["hashes"] are not read again; the
+    rest are hashed in parallel and recorded in the index.
+    """
+    results = [None] * len(paths)
+    to_hash = []
+    stamps = {}
+    for i, path in enumerate(paths):
+        abs_path = os.path.abspath(path)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            continue
+        stamps[i] = (abs_path, st.st_size, st.st_mtime_ns)
+        known = index["hashes"].get(abs_path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            results[i] = known[2]
+        else:
+            to_hash.append(i)
+
+    def safe_hash(i):
+        try:
+            return hash_file(paths[i])
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
+        for i, sha in zip(to_hash, executor.map(safe_hash, to_hash)):
+            results[i] = sha
+            if sha is not None:
+                abs_path, size, mtime = stamps[i]
+                index["hashes"][abs_path] = [size, mtime, sha]
+    return results
+
+def lookup_upload(index, kind, sha):
+    """
+    Returns {"id": ..., "name": ...} if content 'sha' was already uploaded as
+    'kind', else None.
+    """
+    return index["uploads"].get(kind, {}).get(sha)
+
+def record_upload(index, kind, sha, server_id, name):
+    """
+    Records content 'sha' as uploaded as 'kind'. Nothing is recorded without
+    a server id: forget_ids could never drop the entry after a purge, and the
+    content would be skipped as a duplicate forever.
+    """
+    if server_id is None:
+        return
+    index["uploads"].setdefault(kind, {})[sha] = {"id": server_id, "name": name}
+
+def forget_ids(kind, ids, path=INDEX_PATH):
+    """
+    Drops the uploads of 'kind' whose server id is in 'ids', e.g. after they
+    were deleted, so their content is uploaded again next time.
+    """
+    ids = set(ids)
+    if not ids or not os.path.isfile(path):
+        return
+    index = load_index(path)
+    uploads = index["uploads"].get(kind, {})
+    stale = [sha for sha, info in uploads.items() if info.get("id") in ids]
+    if not stale:
+        return
+    for sha in stale:
+        del uploads[sha]
+    save_index(index, path)
+
+def find_duplicates(kind, items, index, workers=DEFAULT_HASH_WORKERS):
+    """
+    Hashes the files of 'items' (a list of (key, path)) and splits them into
+    content that still has to be uploaded and duplicates.
+
+    Returns (hashes, duplicates): 'hashes' maps every hashed key to its
+    SHA-256; 'duplicates' maps each duplicate key to a human-readable reason.
+    The first key carrying a given content in this run is kept; later ones,
+    and content the index says was uploaded before, are duplicates.
+    """
+    shas = hash_files([path for _, path in items], index, workers)
+    hashes = {}
+    duplicates = {}
+    first_seen = {}
+    for (key, _), sha in zip(items, shas):
+        if sha is None:
+            continue
+        hashes[key] = sha
+        previous = lookup_upload(index, kind, sha)
+        if previous is not None:
+            duplicates[key] = f"same content as '{previous['name']}', already uploaded (id {previous['id']})"
+        elif sha in first_seen:
+            duplicates[key] = f"same content as '{first_seen[sha]}' in this run"
+        else:
+            first_seen[sha] = key
+    return hashes, duplicates
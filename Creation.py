@@ -1,9 +1,32 @@
 import os
-import requests
+import sys
+import argparse
+import asyncio
 import json
 import re
-import tkinter as tk
-from tkinter import filedialog
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from Client import (ApiClient, AsyncApiClient, AimdController, DEFAULT_BASE_URL, DEFAULT_ASYNC_CONCURRENCY,
+                    ADAPTIVE_INITIAL, UPLOAD_CHUNK_SIZE, use_endpoints)
+from Schema import Field, compile_schema
+from ContentIndex import load_index, save_index, find_duplicates, record_upload
+from Metrics import RunMetrics, PROFILE_MODES
+import Report
+from Report import confirm, pause
+from ListingCache import invalidate_listing
+from Storage import write_atomic
+from Journal import (journal_path, iter_journal, load_journal, open_journal, close_journal, record_journal,
+                     is_journaled_done, is_journaled_failed)
+from Schedule import (SCHEDULE_ORDERS, order_uploads, load_bandwidth, save_bandwidth, print_upload_plan,
+                      UploadProgress)
+
+# Number of cast uploads kept in flight at once. Kept low by default so a
+# single run does not saturate the backend; raise it for fast links.
+DEFAULT_CAST_UPLOAD_WORKERS = 4
+
+# Ceiling for cast uploads in flight when the adaptive controller sets the level.
+DEFAULT_CAST_MAX_WORKERS = 32
 
 ################################################################################
 # HELPER / UTILITY FUNCTIONS
@@ -24,329 +47,950 @@ def format_displayed_name(name):
 
     return displayed.strip()
 
+def choose_folder(title):
+    """
+    Opens the GUI folder picker. tkinter is imported here rather than at
+    module load, so headless runs (which pass the folder explicitly) never
+    need it and do not pay for loading it.
+    """
+    import tkinter as tk
+    from tkinter import filedialog
+
+    root = tk.Tk()
+    root.withdraw()
+    folder_path = filedialog.askdirectory(title=title)
+    root.destroy()
+    return folder_path
+
 ################################################################################
-# CAST VALIDATION
+# JOURNALED OUTCOMES
 ################################################################################
 
-REQUIRED_FIELDS_CAST = [
-    "title",
-    "department",
-    "university",
-    "category",
-    "visibility",
-    "link",
-    "dateadded"
-]
+# What the create runs journal about each item (see Journal): its fingerprint,
+# the id the server created it under, and whether to retry past failures.
 
-def validate_cast_payload(payload):
+def file_fingerprint(path):
     """
-    Checks whether the cast payload has exactly the required fields
-    (REQUIRED_FIELDS_CAST), none are empty, and no extras.
+    SHA-256 of a (small) file's content, used for article files and icons.
     """
-    payload_keys = set(payload.keys())
-    required_keys = set(REQUIRED_FIELDS_CAST)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    # Check for extra / missing fields
-    extra_keys = payload_keys - required_keys
-    if extra_keys:
-        return False, f"Extra field(s): {list(extra_keys)}"
+def cast_fingerprint(json_bytes, video_file, video_size, video_mtime_ns):
+    """
+    Fingerprint of a cast folder: the content of 'details.json' plus the video
+    name, size and modification time. Hashing multi-GB videos on every run
+    would cost as much as re-reading them, so the video is identified by its
+    metadata instead.
+    """
+    digest = hashlib.sha256()
+    digest.update(json_bytes)
+    digest.update(f"{video_file}:{video_size}:{video_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
 
-    missing_keys = required_keys - payload_keys
-    if missing_keys:
-        return False, f"Missing field(s): {list(missing_keys)}"
+def created_id(response):
+    """
+    Returns the '_id' of the item the server created, or None unless the body
+    carries a non-empty string one.
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    item_id = body.get("_id") if isinstance(body, dict) else None
+    return item_id if isinstance(item_id, str) and item_id else None
+
+def ask_retry_failed_only(journal, keys, item_name, assume_yes=False):
+    """
+    If the journal holds failures among 'keys', asks whether to retry only
+    those. Never asks (and answers no) in non-interactive runs.
+    """
+    failed = [k for k in keys if is_journaled_failed(journal, k)]
+    return ask_retry_failed_count(len(failed), item_name, assume_yes)
 
-    # Ensure no field is empty
-    for key in REQUIRED_FIELDS_CAST:
-        val = payload[key]
-        # All cast fields are expected to be non-empty strings.
-        if not isinstance(val, str) or not val.strip():
-            return False, f"Field '{key}' is empty or not a string."
+def ask_retry_failed_count(count, item_name, assume_yes=False):
+    if not count or assume_yes:
+        return False
+    answer = input(f"\nThe journal lists {count} {item_name} that failed in a previous run. "
+                   "Retry only those? (yes/no): ").strip().lower()
+    return answer == "yes"
 
+################################################################################
+# CAST VALIDATION
+################################################################################
+
+# Every cast field is a required, non-empty string; no other field is allowed.
+CAST_SCHEMA = compile_schema({
+    "title": Field(str),
+    "department": Field(str),
+    "university": Field(str),
+    "category": Field(str),
+    "visibility": Field(str),
+    "link": Field(str),
+    "dateadded": Field(str),
+})
+
+def validate_cast_payload(payload):
+    """
+    Validates a cast payload against CAST_SCHEMA. Returns (is_valid, message),
+    where the message lists every problem found.
+    """
+    errors = CAST_SCHEMA(payload)
+    if errors:
+        return False, " ".join(errors)
     return True, None
 
 ################################################################################
 # ARTICLE VALIDATION
 ################################################################################
 
-# We add "duration" to the required fields, but note that it's an integer field.
-REQUIRED_FIELDS_ARTICLE = [
-    "title",
-    "department",
-    "description",
-    "university",
-    "category",
-    "visibility",
-    "link",
-    "dateadded"
-]
+# Same as casts, plus a description and a positive integer 'duration'.
+ARTICLE_SCHEMA = compile_schema({
+    "title": Field(str),
+    "department": Field(str),
+    "description": Field(str),
+    "university": Field(str),
+    "category": Field(str),
+    "visibility": Field(str),
+    "link": Field(str),
+    "dateadded": Field(str),
+    "duration": Field(int, minimum=1),
+})
 
 def validate_article_payload(payload):
     """
-    Checks whether the article payload has exactly the required fields
-    (REQUIRED_FIELDS_ARTICLE), with the following conditions:
-      - No extra or missing fields
-      - None of the string fields is empty
-      - 'duration' is an integer
+    Validates an article payload against ARTICLE_SCHEMA. Returns
+    (is_valid, message), where the message lists every problem found.
     """
-    payload_keys = set(payload.keys())
-    required_keys = set(REQUIRED_FIELDS_ARTICLE)
+    errors = ARTICLE_SCHEMA(payload)
+    if errors:
+        return False, " ".join(errors)
+    return True, None
+
+################################################################################
+# SCAN MANIFEST
+################################################################################
 
-    extra_keys = payload_keys - required_keys
-    if extra_keys:
-        return False, f"Extra field(s): {list(extra_keys)}"
+# The scan reads every directory and JSON file exactly once and records what
+# the upload phase needs, so nothing is listed or parsed a second time.
+#
+# Results are also kept in a scan cache, one per folder in SCAN_CACHE_DIR
+# under the SHA-1 of its absolute path (like journals), so read-only, network
+# and shared folders get one too and are left untouched. An entry is reused
+# as long as the mtime and size of everything it was built from are
+# unchanged, so rescanning an unchanged tree costs only stat() calls. Cached
+# entries hold no paths: the same folder may be given relative to another
+# working directory next time, so paths are rebuilt from the current scan.
+SCAN_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".datascripts", "scan_cache")
+
+# Bump whenever scanning or validation rules change, so cached results are
+# recomputed instead of trusted.
+SCAN_CACHE_VERSION = 3
+
+# Manifest keys holding paths, left out of the scan cache.
+CAST_PATH_KEYS = ("path", "json_path", "video_path")
+ARTICLE_PATH_KEYS = ("path",)
+
+# Below this many files to (re)validate, a process pool costs more to start
+# than it saves, so the scan stays in-process.
+PARALLEL_SCAN_THRESHOLD = 256
+
+def scan_cache_path(folder_path):
+    folder = os.path.abspath(folder_path)
+    return os.path.join(SCAN_CACHE_DIR, hashlib.sha1(folder.encode("utf-8")).hexdigest() + ".json")
+
+def load_scan_cache(folder_path):
+    """
+    Returns the scan cache of 'folder_path' as a dict holding one {name: entry}
+    mapping per kind ('cast', 'article'). Returns an empty cache when there
+    is none, it cannot be read, or it was built by another version.
+    """
+    empty = {"version": SCAN_CACHE_VERSION, "folder": os.path.abspath(folder_path)}
+    try:
+        with open(scan_cache_path(folder_path), 'r', encoding='utf-8') as cf:
+            data = json.loads(cf.read())
+    except (OSError, ValueError):
+        return empty
+    if not isinstance(data, dict) or data.get("version") != SCAN_CACHE_VERSION:
+        return empty
+    if data.get("folder") != empty["folder"]:
+        return empty
+    return data
+
+def save_scan_cache(folder_path, data):
+    write_atomic(scan_cache_path(folder_path), json.dumps(data), "scan cache")
+
+# Steps of scanning one item, timed inside the scan workers: reading the files
+# (listing included), parsing the JSON, and validating the payload.
+SCAN_STEPS = ("scan.read", "scan.parse", "scan.validate")
+
+def sort_in_folder_order(names, manifest):
+    """
+    Sorts 'names' in place in the order of 'manifest'. Uploads complete in
+    arbitrary order, but failures are reported in folder order.
+    """
+    order = {entry["name"]: i for i, entry in enumerate(manifest)}
+    names.sort(key=order.get)
 
-    missing_keys = required_keys - payload_keys
-    if missing_keys:
-        return False, f"Missing field(s): {list(missing_keys)}"
+def add_scan_timings(metrics, timings):
+    if metrics is not None:
+        for step, seconds in zip(SCAN_STEPS, timings):
+            metrics.add_work(step, seconds)
 
-    # Validate each field
-    for key in REQUIRED_FIELDS_ARTICLE:
-        val = payload[key]
-        if not isinstance(val, str) or not val.strip():
-            return False, f"Field '{key}' is empty or not a string."
+def _without_paths(entry, path_keys):
+    return {key: value for key, value in entry.items() if key not in path_keys}
 
-    return True, None
+def _stat_stamp(st):
+    return [st.st_size, st.st_mtime_ns]
+
+def _stamps_unchanged(dir_path, stamps):
+    for name, stamp in stamps.items():
+        try:
+            st = os.stat(os.path.join(dir_path, name))
+        except OSError:
+            return False
+        if _stat_stamp(st) != stamp:
+            return False
+    return True
+
+def map_scan_jobs(func, jobs, processes=None):
+    """
+    Runs func(name, path) for every (name, path) in 'jobs' and returns the
+    results in the same order as 'jobs', whatever finishes first. Large
+    batches are spread over 'processes' worker processes (default: one per
+    CPU), so JSON parsing and validation use every core.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(jobs) < PARALLEL_SCAN_THRESHOLD:
+        return [func(name, path) for name, path in jobs]
+
+    names = [name for name, _ in jobs]
+    paths = [path for _, path in jobs]
+    chunksize = max(1, len(jobs) // (processes * 8))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(func, names, paths, chunksize=chunksize))
+
+def scan_cast_subfolder(name, path):
+    """
+    Scans one cast subfolder and returns (entry, stamps). 'entry' is the
+    manifest entry; 'stamps' maps each child to [size, mtime] for the scan
+    cache, or is None if the folder could not be listed. The entry also
+    carries 'timings' (see SCAN_STEPS), removed by scan_cast_folder.
+    """
+    timings = [0.0] * len(SCAN_STEPS)
+    start = time.perf_counter()
+    entry = {
+        "name": name,
+        "path": path,
+        "json_file": None,
+        "json_path": None,
+        "video_file": None,
+        "video_path": None,
+        "video_size": 0,
+        "video_mtime": 0,
+        "payload": None,
+        "fingerprint": None,
+        "valid": False,
+        "error": None,
+        "timings": timings,
+    }
+
+    try:
+        with os.scandir(path) as it:
+            children = list(it)
+        stamps = {c.name: _stat_stamp(c.stat()) for c in children}
+    except OSError as e:
+        entry["error"] = f"Error reading folder: {e}"
+        return entry, None
+
+    # Exactly one 'details.json'
+    json_candidates = [c for c in children if c.name.lower() == 'details.json']
+    if len(json_candidates) != 1:
+        entry["error"] = "No suitable single 'details.json' found."
+        return entry, stamps
+
+    # Exactly one other file for video
+    video_candidates = [c for c in children if c.name.lower() != 'details.json']
+    if len(video_candidates) != 1:
+        entry["error"] = "No suitable single video file found."
+        return entry, stamps
+
+    json_entry = json_candidates[0]
+    video_entry = video_candidates[0]
+    if not json_entry.is_file():
+        entry["error"] = "'details.json' file missing."
+        return entry, stamps
+
+    try:
+        with open(json_entry.path, 'rb') as jf:
+            raw = jf.read()
+        read_done = time.perf_counter()
+        timings[0] = read_done - start
+        cast_data = json.loads(raw.decode('utf-8').strip())
+    except json.JSONDecodeError:
+        entry["error"] = "Invalid JSON format."
+        return entry, stamps
+    except Exception as e:
+        entry["error"] = f"Error reading 'details.json': {e}"
+        return entry, stamps
+    parse_done = time.perf_counter()
+    timings[1] = parse_done - read_done
+
+    video_size, video_mtime = stamps[video_entry.name]
+    entry["json_file"] = json_entry.name
+    entry["json_path"] = json_entry.path
+    entry["video_file"] = video_entry.name
+    entry["video_path"] = video_entry.path
+    entry["video_size"] = video_size
+    entry["video_mtime"] = video_mtime
+    entry["fingerprint"] = cast_fingerprint(raw, video_entry.name, video_size, video_mtime)
+
+    # Validate
+    is_valid, err_msg = validate_cast_payload(cast_data)
+    timings[2] = time.perf_counter() - parse_done
+    if not is_valid:
+        entry["error"] = f"Payload error: {err_msg}"
+        return entry, stamps
+
+    entry["payload"] = cast_data
+    entry["valid"] = True
+    return entry, stamps
+
+def _cached_cast_entry(entry, path):
+    """
+    Returns a cast entry from the scan cache with its paths rebuilt under
+    the subfolder 'path'.
+    """
+    def child(name):
+        return name and os.path.join(path, name)
+    return dict(entry, path=path, json_path=child(entry["json_file"]), video_path=child(entry["video_file"]))
+
+def scan_cast_folder(folder_path, use_cache=True, processes=None, metrics=None):
+    """
+    Scans a folder of cast subfolders with os.scandir and returns one
+    manifest entry (dict) per subfolder, in directory order:
+      name, path, json_file, json_path, video_file, video_path, video_size,
+      video_mtime, payload (parsed 'details.json' or None), fingerprint,
+      valid, error
+    Subfolders whose own mtime and whose children's size/mtime match the scan
+    cache are not listed or read again; the rest are scanned in parallel
+    (see map_scan_jobs). Time spent on each of SCAN_STEPS is added to
+    'metrics', if given.
+    """
+    cache_data = load_scan_cache(folder_path) if use_cache else {}
+    cache = cache_data.get("cast", {})
+    fresh = {}
+    manifest = []
+
+    with os.scandir(folder_path) as it:
+        subfolders = [e for e in it if e.is_dir()]
+
+    pending = []  # (manifest index, name, dir_mtime)
+    jobs = []
+    for sf_entry in subfolders:
+        dir_mtime = sf_entry.stat().st_mtime_ns
+        cached = cache.get(sf_entry.name)
+        if (cached and cached["dir_mtime"] == dir_mtime
+                and _stamps_unchanged(sf_entry.path, cached["stamps"])):
+            manifest.append(_cached_cast_entry(cached["entry"], sf_entry.path))
+            fresh[sf_entry.name] = cached
+            continue
+
+        pending.append((len(manifest), sf_entry.name, dir_mtime))
+        jobs.append((sf_entry.name, sf_entry.path))
+        manifest.append(None)
+
+    results = map_scan_jobs(scan_cast_subfolder, jobs, processes)
+    rescanned = len(results)
+    for (index, name, dir_mtime), (entry, stamps) in zip(pending, results):
+        add_scan_timings(metrics, entry.pop("timings"))
+        manifest[index] = entry
+        if stamps is not None:
+            fresh[name] = {"dir_mtime": dir_mtime, "stamps": stamps,
+                           "entry": _without_paths(entry, CAST_PATH_KEYS)}
+
+    if use_cache and (rescanned or len(fresh) != len(cache)):
+        cache_data["cast"] = fresh
+        save_scan_cache(folder_path, cache_data)
+    return manifest
+
+def scan_article_file(name, path):
+    """
+    Reads, parses and validates one article file and returns its manifest
+    entry. 'size' and 'mtime' stay 0 if the file could not be stat'ed.
+    The entry also carries 'timings' (see SCAN_STEPS), removed by
+    scan_article_folder.
+    """
+    timings = [0.0] * len(SCAN_STEPS)
+    entry = {
+        "name": name,
+        "path": path,
+        "size": 0,
+        "mtime": 0,
+        "payload": None,
+        "fingerprint": None,
+        "valid": False,
+        "error": None,
+        "timings": timings,
+    }
+
+    if not os.path.isfile(path):
+        entry["error"] = "Not a file?"
+        return entry
+
+    start = time.perf_counter()
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as jf:
+            raw = jf.read()
+        entry["size"] = st.st_size
+        entry["mtime"] = st.st_mtime_ns
+        entry["fingerprint"] = hashlib.sha256(raw).hexdigest()
+        read_done = time.perf_counter()
+        timings[0] = read_done - start
+        article_data = json.loads(raw.decode('utf-8').strip())
+    except json.JSONDecodeError:
+        entry["error"] = "Invalid JSON format."
+        return entry
+    except Exception as e:
+        entry["error"] = f"Error reading file: {str(e)}"
+        return entry
+    parse_done = time.perf_counter()
+    timings[1] = parse_done - read_done
+
+    # Validate fields
+    is_valid, err_msg = validate_article_payload(article_data)
+    timings[2] = time.perf_counter() - parse_done
+    if not is_valid:
+        entry["error"] = err_msg
+        return entry
+
+    entry["payload"] = article_data
+    entry["valid"] = True
+    return entry
+
+def scan_article_folder(folder_path, valid_extensions=('.txt', '.json'), use_cache=True, processes=None,
+                        metrics=None):
+    """
+    Scans the top level of an article folder with os.scandir and returns one
+    manifest entry (dict) per candidate file, in directory order:
+      name, path, size, mtime, payload (parsed JSON or None), fingerprint,
+      valid, error
+    Files whose size and mtime match the scan cache are not read again; the
+    rest are parsed and validated in parallel (see map_scan_jobs). Time spent
+    on each of SCAN_STEPS is added to 'metrics', if given.
+    """
+    cache_data = load_scan_cache(folder_path) if use_cache else {}
+    cache = cache_data.get("article", {})
+    fresh = {}
+    manifest = []
+
+    with os.scandir(folder_path) as it:
+        candidates = [e for e in it if e.name.lower().endswith(valid_extensions)]
+
+    pending = []  # manifest indexes awaiting a scan
+    jobs = []
+    for file_entry in candidates:
+        cached = cache.get(file_entry.name)
+        if cached:
+            try:
+                unchanged = _stat_stamp(file_entry.stat()) == [cached["size"], cached["mtime"]]
+            except OSError:
+                unchanged = False
+            if unchanged:
+                manifest.append(dict(cached, path=file_entry.path))
+                fresh[file_entry.name] = cached
+                continue
+
+        pending.append(len(manifest))
+        jobs.append((file_entry.name, file_entry.path))
+        manifest.append(None)
+
+    results = map_scan_jobs(scan_article_file, jobs, processes)
+    rescanned = len(results)
+    for index, entry in zip(pending, results):
+        add_scan_timings(metrics, entry.pop("timings"))
+        manifest[index] = entry
+        if entry["mtime"]:
+            fresh[entry["name"]] = _without_paths(entry, ARTICLE_PATH_KEYS)
+
+    if use_cache and (rescanned or len(fresh) != len(cache)):
+        cache_data["article"] = fresh
+        save_scan_cache(folder_path, cache_data)
+    return manifest
 
 ################################################################################
 # UNIVERSITIES
 ################################################################################
 
-def create_universities():
-    print("\n" + "="*50)
-    print("          UNIVERSITY CREATION UTILITY".center(50))
-    print("="*50 + "\n")
+# Files in a university folder that are taken as icons.
+ICON_EXTENSIONS = ('.png', '.jpg', '.jpeg')
 
-    # Open a file navigator to choose the folder
-    root = tk.Tk()
-    root.withdraw()
-    folder_path = filedialog.askdirectory(title="Select Folder Containing University Icons")
-    root.destroy()
+def list_icon_files(folder_path):
+    return [f for f in os.listdir(folder_path) if f.lower().endswith(ICON_EXTENSIONS)]
+
+def create_universities(folder_path=None, retry_failed_only=False, dedupe=True, assume_yes=False,
+                        base_url=DEFAULT_BASE_URL, metrics_path=None, profile=None, names=None):
+    """
+    Creates one university per image in the selected folder. Outcomes are
+    journaled, so icons that were already created are skipped on a rerun;
+    with 'retry_failed_only', only icons that failed last time are sent.
+    With 'dedupe', icons whose content was already uploaded (in this run or,
+    per the content index, an earlier one) are reported and skipped.
+    Timings and request metrics are printed at the end ('metrics_path' also
+    saves them as JSON); 'profile' profiles the upload phase. With 'names',
+    only those icons are sent, whatever the journal says (used by sync).
+
+    Without 'folder_path' the GUI picker is shown. With 'assume_yes' no
+    question is asked, so the function can run headless. Returns the number
+    of failures, or None if nothing was attempted.
+    """
+    Report.info("\n" + "="*50)
+    Report.info("          UNIVERSITY CREATION UTILITY".center(50))
+    Report.info("="*50 + "\n")
+
+    # Open a file navigator to choose the folder, unless one was given
+    if folder_path is None:
+        folder_path = choose_folder("Select Folder Containing University Icons")
 
     if not folder_path:
-        print("No folder selected. Exiting.")
+        Report.error("No folder selected. Exiting.")
         return
     if not os.path.isdir(folder_path):
-        print("Invalid folder path. Exiting.")
+        Report.error("Invalid folder path. Exiting.")
         return
 
-    files = os.listdir(folder_path)
-    image_extensions = ('.png', '.jpg', '.jpeg')
-    image_files = [f for f in files if f.lower().endswith(image_extensions)]
+    image_files = list_icon_files(folder_path)
 
     if not image_files:
-        print("No image files found in the selected folder.")
+        Report.info("No image files found in the selected folder.")
         return
 
-    print(f"\nFound {len(image_files)} image file(s) to create universities from:")
+    Report.info(f"\nFound {len(image_files)} image file(s) to create universities from:")
     for img_file in image_files:
-        print(f"  - {img_file}")
+        Report.item(f"  - {img_file}")
 
-    proceed = input("\nDo you want to proceed with creation of these universities? (yes/no): ").strip().lower()
-    if proceed != "yes":
-        print("\nAborting creation process.")
-        return
+    journal = load_journal(folder_path, "university")
+    if not retry_failed_only and names is None:
+        retry_failed_only = ask_retry_failed_only(journal, image_files, "universities", assume_yes)
 
-    url = "http://3.17.219.54/university"
+    if not confirm("\nDo you want to proceed with creation of these universities? (yes/no): ", assume_yes):
+        Report.info("\nAborting creation process.")
+        return
 
+    # Decide what to send before touching the network
+    to_upload = []  # (img_file, icon_path, fingerprint)
     for img_file in image_files:
-        base_name = os.path.splitext(img_file)[0]
-        displayed_name = format_displayed_name(base_name)
-
-        uni_data = {
-            "name": base_name,
-            "displayedName": displayed_name
-        }
+        if names is not None and img_file not in names:
+            continue
+        if retry_failed_only and not is_journaled_failed(journal, img_file):
+            continue
 
         icon_path = os.path.join(folder_path, img_file)
         if not os.path.isfile(icon_path):
-            print(f"File not found: {icon_path}, skipping...")
+            Report.error(f"File not found: {icon_path}, skipping...")
             continue
 
-        files_data = {
-            'icon': (img_file, open(icon_path, 'rb'), 'image/png'),
-            'university': (None, json.dumps(uni_data), 'application/json')
-        }
-
-        try:
-            response = requests.post(url, files=files_data)
-        except Exception as e:
-            print(f"Failed to send request for {img_file}. Error: {e}. Skipping...")
+        fingerprint = file_fingerprint(icon_path)
+        if names is None and is_journaled_done(journal, img_file, fingerprint):
+            Report.item(f"Already created university from {img_file}, skipping...")
             continue
+        to_upload.append((img_file, icon_path, fingerprint))
+
+    metrics = RunMetrics("universities", profile=profile)
+    content_index = load_index()
+    hashes = {}
+    if dedupe and to_upload:
+        with metrics.phase("dedupe"):
+            hashes, duplicates = find_duplicates(
+                "university", [(img_file, icon_path) for img_file, icon_path, _ in to_upload], content_index)
+        for img_file, _, _ in to_upload:
+            if img_file in duplicates:
+                Report.item(f"Skipping {img_file}: {duplicates[img_file]}.")
+        to_upload = [item for item in to_upload if item[0] not in duplicates]
 
-        if response.status_code == 201:
-            print(f"Successfully created university: {displayed_name}")
-        else:
-            print(f"Failed to create university from {img_file}. Status code: {response.status_code}. Skipping...")
+    fail_count = 0
+    client = ApiClient(base_url, pool_size=1, metrics=metrics)
+    journal_file = None
 
-    print("\nCreation process completed.\n")
+    with metrics.phase("upload", profiled=True), Report.Progress("Universities", len(to_upload)) as progress:
+        try:
+            journal_file = open_journal(folder_path)
+            for img_file, icon_path, fingerprint in to_upload:
+                base_name = os.path.splitext(img_file)[0]
+                displayed_name = format_displayed_name(base_name)
+
+                uni_data = {
+                    "name": base_name,
+                    "displayedName": displayed_name
+                }
+
+                parts = [
+                    ('icon', img_file, icon_path, 'image/png'),
+                    ('university', None, json.dumps(uni_data), 'application/json')
+                ]
+
+                try:
+                    response = client.post_multipart("/university", parts)
+                except Exception as e:
+                    Report.error(f"Failed to send request for {img_file}. Error: {e}. Skipping...")
+                    fail_count += 1
+                    progress.advance(ok=False)
+                    record_journal(journal_file, "university", img_file, fingerprint, False, error=str(e))
+                    continue
+
+                if response.status_code == 201:
+                    Report.item(f"Successfully created university: {displayed_name}")
+                    server_id = created_id(response)
+                    record_journal(journal_file, "university", img_file, fingerprint, True, server_id=server_id)
+                    if img_file in hashes:
+                        record_upload(content_index, "university", hashes[img_file], server_id, img_file)
+                else:
+                    Report.error(f"Failed to create university from {img_file}. "
+                                 f"Status code: {response.status_code}. Skipping...")
+                    fail_count += 1
+                    record_journal(journal_file, "university", img_file, fingerprint, False,
+                                   error=f"Status code: {response.status_code}")
+                progress.advance(ok=response.status_code == 201)
+        finally:
+            close_journal(journal_file)
+            client.close()
+            if dedupe:
+                save_index(content_index)
+            invalidate_listing(f"{base_url}/university")
+
+    Report.info("\nCreation process completed.\n")
+    metrics.count("success", len(to_upload) - fail_count)
+    metrics.count("failed", fail_count)
+    metrics.report(metrics_path)
+    return fail_count
 
 ################################################################################
 # CASTS
 ################################################################################
 
-def create_casts():
-    print("\n" + "="*50)
-    print("           CAST CREATION UTILITY".center(50))
-    print("="*50 + "\n")
+def upload_cast(client, entry, brightmindid):
+    """
+    Uploads the cast described by manifest 'entry'. Runs inside a worker
+    thread, so it does not touch any shared state: it returns
+    (name, ok, message, server_id, seconds) and leaves counting, printing
+    and journaling to the caller. 'seconds' is the time the successful
+    attempt took to send and be answered (None on failure), leaving out
+    waits for a limiter slot and backoff between retries.
+    """
+    sf = entry["name"]
+    cast_data = dict(entry["payload"])
+    cast_data["brightmindid"] = brightmindid
+
+    parts = [
+        ('video', entry["video_file"], entry["video_path"], 'video/mp4'),
+        ('cast', None, json.dumps(cast_data), 'application/json')
+    ]
+
+    try:
+        response = client.post_multipart("/cast", parts)
+    except Exception as e:
+        return sf, False, f"Failed to send request for '{sf}'. Error: {e}. Skipping...", None, None
+
+    if response.status_code == 201:
+        return (sf, True, f"Successfully created cast from folder '{sf}'.", created_id(response),
+                response.elapsed.total_seconds())
+    return sf, False, f"Failed to create cast from folder '{sf}'. Status code: {response.status_code}.", None, None
+
+def create_casts(folder_path=None, brightmindid=None, workers=DEFAULT_CAST_UPLOAD_WORKERS,
+                 retry_failed_only=False, scan_processes=None, dedupe=True, assume_yes=False,
+                 base_url=DEFAULT_BASE_URL, metrics_path=None, profile=None, names=None, adaptive=False,
+                 max_workers=DEFAULT_CAST_MAX_WORKERS, order="largest", bandwidth=None, plan_only=False):
+    """
+    Creates casts from a folder of subfolders, each holding a 'details.json'
+    and exactly one video file. Valid subfolders are uploaded concurrently by
+    'workers' threads sharing one pooled ApiClient. With 'adaptive', 'workers'
+    is only the starting level: an AimdController raises it up to
+    'max_workers' while the backend keeps up and cuts it on 429/5xx,
+    errors or latency spikes.
+
+    Uploads are submitted in 'order' (see Schedule.SCHEDULE_ORDERS), by
+    default largest video first, so no big upload is left running alone at
+    the end. Before asking for confirmation, an upload plan with the total
+    bytes and the estimated wall-clock time is printed, using 'bandwidth'
+    (bytes/s per upload) or else the rate measured in the last run; with
+    'plan_only' nothing more is done. Each completed upload shows progress
+    and an ETA from the rate measured so far.
+
+    Outcomes are journaled (see Journal): subfolders that were already
+    created (and have not changed since) are skipped on a rerun, and with
+    'retry_failed_only' only the subfolders that failed last time are sent.
+    'scan_processes' sets how many processes validate the folders
+    (default: one per CPU). With 'dedupe', videos are hashed first and any
+    whose content was already uploaded, in this run or an earlier one, are
+    reported and skipped instead of sent again.
+
+    Phase timings, request latency percentiles and MB/s are printed at the
+    end and, with 'metrics_path', written there as JSON. 'profile' ("cpu" or
+    "memory") profiles the scan and upload phases (see Metrics.RunMetrics).
+    With 'names', only those subfolders are sent, whatever the journal says
+    (used by sync).
+
+    'folder_path' and 'brightmindid' are asked for when not given (GUI picker
+    and prompt). With 'assume_yes' no question is asked, so the function can
+    run headless. Returns the number of failures, or None if nothing was
+    attempted.
+    """
+    Report.info("\n" + "="*50)
+    Report.info("           CAST CREATION UTILITY".center(50))
+    Report.info("="*50 + "\n")
 
-    brightmindid = input("Enter the brightmindid value to be added to each cast: ").strip()
+    if brightmindid is None:
+        brightmindid = "" if assume_yes else input(
+            "Enter the brightmindid value to be added to each cast: ").strip()
     if not brightmindid:
-        print("No brightmindid provided, defaulting to an empty string.")
+        Report.info("No brightmindid provided, defaulting to an empty string.")
         brightmindid = ""
 
-    root = tk.Tk()
-    root.withdraw()
-    folder_path = filedialog.askdirectory(title="Select Folder Containing Cast Subfolders")
-    root.destroy()
+    if folder_path is None:
+        folder_path = choose_folder("Select Folder Containing Cast Subfolders")
 
     if not folder_path:
-        print("No folder selected. Exiting.")
+        Report.error("No folder selected. Exiting.")
         return
     if not os.path.isdir(folder_path):
-        print("Invalid folder path. Exiting.")
+        Report.error("Invalid folder path. Exiting.")
         return
 
-    subfolders = [f for f in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, f))]
-    if not subfolders:
-        print("No subfolders found.")
+    metrics = RunMetrics("casts", profile=profile)
+    with metrics.phase("scan", profiled=True):
+        manifest = scan_cast_folder(folder_path, processes=scan_processes, metrics=metrics)
+    if not manifest:
+        Report.info("No subfolders found.")
         return
 
-    print(f"\nFound {len(subfolders)} subfolder(s) to create casts from:")
-
-    validation_results = {}  # subfolder -> (is_valid, error_msg)
-
-    # Validate all subfolders
-    for sf in subfolders:
-        sf_path = os.path.join(folder_path, sf)
-        if not os.path.isdir(sf_path):
-            validation_results[sf] = (False, "Not a directory?")
-            continue
-
-        files_in_sf = os.listdir(sf_path)
-
-        # Exactly one 'details.json'
-        json_candidates = [f for f in files_in_sf if f.lower() == 'details.json']
-        if len(json_candidates) != 1:
-            validation_results[sf] = (False, "No suitable single 'details.json' found.")
-            continue
-
-        # Exactly one other file for video
-        video_candidates = [f for f in files_in_sf if f.lower() != 'details.json']
-        if len(video_candidates) != 1:
-            validation_results[sf] = (False, "No suitable single video file found.")
-            continue
-
-        json_file = json_candidates[0]
-        json_path = os.path.join(sf_path, json_file)
-        if not os.path.isfile(json_path):
-            validation_results[sf] = (False, "'details.json' file missing.")
-            continue
-
-        try:
-            with open(json_path, 'r', encoding='utf-8') as jf:
-                content = jf.read().strip()
-                cast_data = json.loads(content)
-        except json.JSONDecodeError:
-            validation_results[sf] = (False, "Invalid JSON format.")
-            continue
-        except Exception as e:
-            validation_results[sf] = (False, f"Error reading 'details.json': {e}")
-            continue
-
-        # Validate
-        is_valid, err_msg = validate_cast_payload(cast_data)
-        if not is_valid:
-            validation_results[sf] = (False, f"Payload error: {err_msg}")
-            continue
-
-        validation_results[sf] = (True, None)
+    Report.info(f"\nFound {len(manifest)} subfolder(s) to create casts from:")
 
     # Display subfolders and any errors
-    for sf in subfolders:
-        is_valid, err_msg = validation_results.get(sf, (False, "Unknown error"))
-        if is_valid:
-            print(f"  - {sf}")
+    for entry in manifest:
+        if entry["valid"]:
+            Report.item(f"  - {entry['name']}")
         else:
-            print(f"  - {sf}  (PAYLOAD ERROR: {err_msg})")
+            Report.info(f"  - {entry['name']}  (PAYLOAD ERROR: {entry['error']})")
 
-    proceed = input("\nDo you want to proceed with creation of these casts? (yes/no): ").strip().lower()
-    if proceed != "yes":
-        print("\nAborting creation process.")
-        return
+    journal = load_journal(folder_path, "cast")
+    if not retry_failed_only and names is None:
+        retry_failed_only = ask_retry_failed_only(journal, [e["name"] for e in manifest], "cast folder(s)",
+                                                  assume_yes)
 
-    url = "http://3.17.219.54/cast"
+    selected = [
+        entry for entry in manifest
+        if (names is None or entry["name"] in names)
+        and (not retry_failed_only or is_journaled_failed(journal, entry["name"]))
+    ]
 
     success_count = 0
     fail_count = 0
+    skipped_count = 0
     failed_folders = []
-
-    # Create the casts
-    for sf in subfolders:
-        sf_path = os.path.join(folder_path, sf)
-        is_valid, err_msg = validation_results[sf]
-        if not is_valid:
-            print(f"Skipping '{sf}' due to payload error: {err_msg}")
+    fingerprints = {}
+
+    # Invalid folders, those already created and duplicate videos are sorted
+    # out before the plan, so it only counts what will really be uploaded.
+    to_upload = []
+    invalid = []
+    for entry in selected:
+        sf = entry["name"]
+        if not entry["valid"]:
+            Report.error(f"Skipping '{sf}' due to payload error: {entry['error']}")
             fail_count += 1
             failed_folders.append(sf)
+            invalid.append(entry)
             continue
 
-        files_in_sf = os.listdir(sf_path)
-        json_file = 'details.json'
-        video_candidates = [f for f in files_in_sf if f.lower() != 'details.json']
-        video_file = video_candidates[0]
-
-        json_path = os.path.join(sf_path, json_file)
-        video_path = os.path.join(sf_path, video_file)
-
-        try:
-            with open(json_path, 'r', encoding='utf-8') as jf:
-                cast_data = json.loads(jf.read().strip())
-        except Exception as e:
-            print(f"Skipping '{sf}' due to error reading 'details.json': {e}")
-            fail_count += 1
-            failed_folders.append(sf)
+        fingerprints[sf] = entry["fingerprint"]
+        if names is None and is_journaled_done(journal, sf, entry["fingerprint"]):
+            skipped_count += 1
             continue
+        to_upload.append(entry)
+
+    if skipped_count:
+        Report.info(f"Skipping {skipped_count} cast folder(s) already created in a previous run.")
+
+    content_index = load_index()
+    hashes = {}
+    duplicate_count = 0
+    if dedupe and to_upload:
+        Report.info("Hashing videos to detect duplicates...")
+        with metrics.phase("dedupe"):
+            hashes, duplicates = find_duplicates(
+                "cast", [(entry["name"], entry["video_path"]) for entry in to_upload], content_index)
+        for entry in to_upload:
+            if entry["name"] in duplicates:
+                Report.item(f"Skipping '{entry['name']}': {duplicates[entry['name']]}.")
+                duplicate_count += 1
+        to_upload = [entry for entry in to_upload if entry["name"] not in duplicates]
+        if duplicate_count:
+            Report.info(f"Skipping {duplicate_count} cast folder(s) with a duplicate video.")
+
+    workers = max(1, int(workers))
+    bandwidth_source = "given"
+    if bandwidth is None:
+        bandwidth = load_bandwidth("cast")
+        bandwidth_source = "measured in the last run"
+    print_upload_plan("casts", [entry["video_size"] for entry in to_upload], order, workers, bandwidth,
+                      bandwidth_source)
+    if plan_only:
+        Report.info("\nPlan only: nothing was uploaded.")
+        return
 
-        cast_data["brightmindid"] = brightmindid
-
-        files_data = {
-            'video': (video_file, open(video_path, 'rb'), 'video/mp4'),
-            'cast': (None, json.dumps(cast_data), 'application/json')
-        }
+    if not confirm("\nDo you want to proceed with creation of these casts? (yes/no): ", assume_yes):
+        Report.info("\nAborting creation process.")
+        return
 
+    # Create the casts. Workers only perform the upload; all counters, output
+    # and journal writes happen here, on the main thread, as results come back.
+    limiter = None
+    if adaptive:
+        limiter = AimdController(initial=workers, maximum=max(workers, max_workers))
+        workers = limiter.maximum
+    to_upload = order_uploads(to_upload, order)
+    progress = UploadProgress({entry["name"]: entry["video_size"] for entry in to_upload}, bandwidth)
+
+    def lanes():
+        return workers if limiter is None else limiter.limit
+
+    def status():
+        return progress.describe() + ("" if limiter is None else f", concurrency {limiter.limit}")
+
+    with metrics.phase("upload", profiled=True), \
+            Report.Progress("Casts", len(to_upload), status, lambda: progress.eta(lanes())) as line:
+        client = ApiClient(base_url, pool_size=workers, metrics=metrics, limiter=limiter)
+        journal_file = None
         try:
-            response = requests.post(url, files=files_data)
-        except Exception as e:
-            print(f"Failed to send request for '{sf}'. Error: {e}. Skipping...")
-            fail_count += 1
-            failed_folders.append(sf)
-            continue
-
-        if response.status_code == 201:
-            print(f"Successfully created cast from folder '{sf}'.")
-            success_count += 1
-        else:
-            print(f"Failed to create cast from folder '{sf}'. Status code: {response.status_code}.")
-            fail_count += 1
-            failed_folders.append(sf)
-
-    print("\nCAST CREATION SUMMARY:")
-    print(f"  Success: {success_count}")
-    print(f"  Failed: {fail_count}")
+            journal_file = open_journal(folder_path)
+            for entry in invalid:
+                record_journal(journal_file, "cast", entry["name"], None, False, error=entry["error"])
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(upload_cast, client, entry, brightmindid) for entry in to_upload]
+                for future in as_completed(futures):
+                    sf, ok, message, server_id, seconds = future.result()
+                    progress.finish(sf, seconds, ok)
+                    (Report.item if ok else Report.error)(message)
+                    line.advance(ok)
+                    record_journal(journal_file, "cast", sf, fingerprints[sf], ok,
+                                   server_id=server_id, error=None if ok else message)
+                    if ok:
+                        success_count += 1
+                        if sf in hashes:
+                            record_upload(content_index, "cast", hashes[sf], server_id, sf)
+                    else:
+                        fail_count += 1
+                        failed_folders.append(sf)
+        finally:
+            client.close()
+            close_journal(journal_file)
+            if dedupe:
+                save_index(content_index)
+            invalidate_listing(f"{base_url}/cast")
+            if progress.measured() is not None:
+                save_bandwidth("cast", progress.measured())
+
+    sort_in_folder_order(failed_folders, manifest)
+
+    Report.info("\nCAST CREATION SUMMARY:")
+    Report.info(f"  Success: {success_count}")
+    Report.info(f"  Failed: {fail_count}")
+    Report.info(f"  Already created (per the journal): {skipped_count}")
+    Report.info(f"  Duplicates skipped: {duplicate_count}")
+    if limiter is not None:
+        Report.info(f"  Adaptive: {limiter.describe()}")
     if failed_folders:
-        print("  Failed folders:")
+        Report.info("  Failed folders:")
         for ff in failed_folders:
-            print(f"    - {ff}")
+            Report.info(f"    - {ff}")
 
-    input("\nPress Enter to exit...")
+    metrics.count("success", success_count)
+    metrics.count("failed", fail_count)
+    metrics.count("already_created", skipped_count)
+    metrics.count("duplicates", duplicate_count)
+    metrics.report(metrics_path)
+
+    pause(assume_yes)
+    return fail_count
 
 ################################################################################
 # ARTICLES
 ################################################################################
 
-def create_articles():
+async def post_articles_async(base_url, to_send, concurrency, on_result, metrics=None, limiter=None):
+    """
+    POSTs every (filename, fingerprint, article_data) in 'to_send' (a list
+    or any iterator) with up to 'concurrency' requests in flight. A fixed set
+    of sender coroutines pulls from one iterator, so memory does not grow
+    with the number of articles.
+    on_result(filename, fingerprint, response, error) runs on the event loop
+    as each request completes. Requests are recorded in 'metrics', if given;
+    with 'limiter' (an AimdController), it sets how many of the senders may
+    have a request in flight.
+    """
+    pending = iter(to_send)
+
+    async def sender(client):
+        for filename, fingerprint, article_data in pending:
+            try:
+                response = await client.post_json("/article", article_data)
+            except Exception as e:
+                on_result(filename, fingerprint, None, e)
+                continue
+            on_result(filename, fingerprint, response, None)
+
+    async with AsyncApiClient(base_url, concurrency=concurrency, metrics=metrics, limiter=limiter) as client:
+        senders = max(1, concurrency)
+        if isinstance(to_send, list):
+            senders = min(senders, max(1, len(to_send)))
+        await asyncio.gather(*(sender(client) for _ in range(senders)))
+
+def concurrency_status(limiter):
+    """
+    Progress line status showing the level set by 'limiter', if any.
+    """
+    if limiter is None:
+        return None
+    return lambda: f"concurrency {limiter.limit}"
+
+def send_articles(base_url, to_send, on_result, async_mode=False, concurrency=DEFAULT_ASYNC_CONCURRENCY,
+                  metrics=None, limiter=None):
+    """
+    Sends every (filename, fingerprint, article_data) in 'to_send', one at a
+    time or, with 'async_mode', through post_articles_async. 'to_send' is
+    consumed lazily in both cases. on_result is as for post_articles_async.
+    """
+    if async_mode:
+        asyncio.run(post_articles_async(base_url, to_send, concurrency, on_result, metrics, limiter))
+        return
+    client = ApiClient(base_url, pool_size=1, metrics=metrics)
+    try:
+        for filename, fingerprint, article_data in to_send:
+            if Report.is_enabled(Report.DEBUG):
+                Report.debug(f"\nDEBUG - Payload for '{filename}':\n{json.dumps(article_data, indent=2)}")
+
+            try:
+                response = client.post_json("/article", article_data)
+            except Exception as e:
+                on_result(filename, fingerprint, None, e)
+                continue
+            on_result(filename, fingerprint, response, None)
+    finally:
+        client.close()
+
+def create_articles(folder_path=None, brightmindid=None, retry_failed_only=False, scan_processes=None,
+                    assume_yes=False, base_url=DEFAULT_BASE_URL, async_mode=False,
+                    concurrency=DEFAULT_ASYNC_CONCURRENCY, metrics_path=None, profile=None, names=None,
+                    adaptive=False):
     """
-    Creates articles from a folder of text/json files at the top level.
+    Creates articles from a folder of text/json files at the top level, or
+    from one NDJSON/JSONL file given as 'folder_path' (see
+    create_articles_from_ndjson).
     - Prompts user for brightmindid (added to each article).
     - Validates each file's JSON structure:
        * Must contain all required fields, including integer 'duration'
@@ -355,139 +999,381 @@ def create_articles():
        * duration is integer > 0
     - Summarizes errors.
     - If user proceeds, POSTs each valid article to the endpoint.
+    - Journals every outcome: files already created (and unchanged) are
+      skipped on a rerun; 'retry_failed_only' sends only last run's failures.
+    - Validates files across 'scan_processes' processes (default: one per CPU).
+    - 'folder_path' / 'brightmindid' are asked for when not given; with
+      'assume_yes' nothing is asked, so it can run headless.
+    - With 'async_mode', articles are sent by an asyncio client keeping up
+      to 'concurrency' requests in flight instead of one at a time.
+    - 'adaptive' implies 'async_mode': an AimdController starts low and
+      raises the level towards 'concurrency' while the backend keeps up,
+      cutting it on 429/5xx, errors or latency spikes.
+    - Prints phase timings, latency percentiles and MB/s at the end
+      ('metrics_path' also saves them as JSON); 'profile' ("cpu" or
+      "memory") profiles the scan and upload phases.
+    - With 'names', only those files are sent, whatever the journal says
+      (used by sync).
+    - Returns the number of failures, or None if nothing was attempted.
     """
-    print("\n" + "="*50)
-    print("          ARTICLE CREATION UTILITY".center(50))
-    print("="*50 + "\n")
+    Report.info("\n" + "="*50)
+    Report.info("          ARTICLE CREATION UTILITY".center(50))
+    Report.info("="*50 + "\n")
 
-    brightmindid = input("Enter the brightmindid value to be added to each article: ").strip()
+    if brightmindid is None:
+        brightmindid = "" if assume_yes else input(
+            "Enter the brightmindid value to be added to each article: ").strip()
     if not brightmindid:
-        print("No brightmindid provided, defaulting to empty string.")
+        Report.info("No brightmindid provided, defaulting to empty string.")
         brightmindid = ""
 
-    # Choose folder
-    root = tk.Tk()
-    root.withdraw()
-    folder_path = filedialog.askdirectory(title="Select Folder Containing Article JSON Files")
-    root.destroy()
+    # Choose folder, unless one was given
+    if folder_path is None:
+        folder_path = choose_folder("Select Folder Containing Article JSON Files")
 
     if not folder_path:
-        print("No folder selected. Exiting.")
+        Report.error("No folder selected. Exiting.")
         return
+    if is_ndjson_file(folder_path):
+        return create_articles_from_ndjson(folder_path, brightmindid, retry_failed_only=retry_failed_only,
+                                           assume_yes=assume_yes, base_url=base_url, async_mode=async_mode,
+                                           concurrency=concurrency, metrics_path=metrics_path,
+                                           profile=profile, adaptive=adaptive)
     if not os.path.isdir(folder_path):
-        print("Invalid folder path. Exiting.")
+        Report.error("Invalid folder path. Exiting.")
         return
 
     # We accept .txt or .json as candidate files
-    valid_extensions = ('.txt', '.json')
-    all_files = os.listdir(folder_path)
-    article_candidates = [f for f in all_files if f.lower().endswith(valid_extensions)]
+    metrics = RunMetrics("articles", profile=profile)
+    with metrics.phase("scan", profiled=True):
+        manifest = scan_article_folder(folder_path, processes=scan_processes, metrics=metrics)
 
-    if not article_candidates:
-        print("No .txt or .json files found in the selected folder.")
+    if not manifest:
+        Report.info("No .txt or .json files found in the selected folder.")
         return
 
-    print(f"\nFound {len(article_candidates)} file(s) to create articles from:")
-
-    # Validate each file
-    validation_results = {}
-    for filename in article_candidates:
-        file_path = os.path.join(folder_path, filename)
-        if not os.path.isfile(file_path):
-            validation_results[filename] = (False, "Not a file?")
-            continue
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as jf:
-                content = jf.read().strip()
-                article_data = json.loads(content)
-        except json.JSONDecodeError:
-            validation_results[filename] = (False, "Invalid JSON format.")
-            continue
-        except Exception as e:
-            validation_results[filename] = (False, f"Error reading file: {str(e)}")
-            continue
-
-        # Validate fields
-        is_valid, err_msg = validate_article_payload(article_data)
-        if not is_valid:
-            validation_results[filename] = (False, err_msg)
-        else:
-            validation_results[filename] = (True, None)
+    Report.info(f"\nFound {len(manifest)} file(s) to create articles from:")
 
     # Display
-    for filename in article_candidates:
-        is_valid, err_msg = validation_results[filename]
-        if is_valid:
-            print(f"  - {filename}")
+    for entry in manifest:
+        if entry["valid"]:
+            Report.item(f"  - {entry['name']}")
         else:
-            print(f"  - {filename}  (PAYLOAD ERROR: {err_msg})")
+            Report.info(f"  - {entry['name']}  (PAYLOAD ERROR: {entry['error']})")
 
-    proceed = input("\nDo you want to proceed with creation of these articles? (yes/no): ").strip().lower()
-    if proceed != "yes":
-        print("\nAborting article creation process.")
-        return
+    journal = load_journal(folder_path, "article")
+    if not retry_failed_only and names is None:
+        retry_failed_only = ask_retry_failed_only(journal, [e["name"] for e in manifest], "article file(s)",
+                                                  assume_yes)
 
-    url = "http://3.17.219.54/article"
+    if not confirm("\nDo you want to proceed with creation of these articles? (yes/no): ", assume_yes):
+        Report.info("\nAborting article creation process.")
+        return
 
     success_count = 0
     fail_count = 0
+    skipped_count = 0
     failed_files = []
 
-    for filename in article_candidates:
-        is_valid, err_msg = validation_results[filename]
-        if not is_valid:
-            print(f"Skipping '{filename}' due to payload error: {err_msg}")
-            fail_count += 1
-            failed_files.append(filename)
+    limiter = None
+    if adaptive:
+        async_mode = True
+        limiter = AimdController(initial=min(ADAPTIVE_INITIAL, concurrency), maximum=concurrency)
+
+    to_send = []  # (filename, fingerprint, article_data)
+    invalid = []
+    for entry in manifest:
+        filename = entry["name"]
+        if names is not None and filename not in names:
+            continue
+        if retry_failed_only and not is_journaled_failed(journal, filename):
             continue
 
-        file_path = os.path.join(folder_path, filename)
-        try:
-            with open(file_path, 'r', encoding='utf-8') as jf:
-                article_data = json.loads(jf.read().strip())
-        except Exception as e:
-            print(f"Skipping '{filename}' due to error reading file: {e}")
+        if not entry["valid"]:
+            Report.error(f"Skipping '{filename}' due to payload error: {entry['error']}")
             fail_count += 1
             failed_files.append(filename)
+            invalid.append(entry)
             continue
 
+        fingerprint = entry["fingerprint"]
+        if names is None and is_journaled_done(journal, filename, fingerprint):
+            skipped_count += 1
+            continue
+
+        article_data = dict(entry["payload"])
+
         # Insert brightmindid
         article_data["brightmindid"] = brightmindid
+        to_send.append((filename, fingerprint, article_data))
 
-        # Debug: Print the payload before sending
-        print(f"\nDEBUG - Payload for '{filename}':")
-        print(json.dumps(article_data, indent=2))
-
-        try:
-            response = requests.post(url, json=article_data)
-        except Exception as e:
-            print(f"Failed to send request for '{filename}'. Error: {e}. Skipping...")
+    def handle_result(filename, fingerprint, response, error):
+        # Called once per article, always from this thread (or its event loop).
+        nonlocal success_count, fail_count
+        if error is not None:
+            Report.error(f"Failed to send request for '{filename}'. Error: {error}. Skipping...")
             fail_count += 1
             failed_files.append(filename)
-            continue
-
-        if response.status_code == 201:
-            print(f"Successfully created article from file '{filename}'.")
+            record_journal(journal_file, "article", filename, fingerprint, False, error=str(error))
+        elif response.status_code == 201:
+            Report.item(f"Successfully created article from file '{filename}'.")
             success_count += 1
+            record_journal(journal_file, "article", filename, fingerprint, True,
+                           server_id=created_id(response))
         else:
             # Capture response.text for additional error details
             error_detail = response.text
-            print(f"Failed to create article from file '{filename}'. "
-                  f"Status code: {response.status_code}. "
-                  f"Error detail: {error_detail}")
+            Report.error(f"Failed to create article from file '{filename}'. "
+                         f"Status code: {response.status_code}. "
+                         f"Error detail: {error_detail}")
             fail_count += 1
             failed_files.append(filename)
+            record_journal(journal_file, "article", filename, fingerprint, False,
+                           error=f"Status code: {response.status_code}. {error_detail}")
+        progress.advance(ok=error is None and response.status_code == 201)
 
-    print("\nARTICLE CREATION SUMMARY:")
-    print(f"  Success: {success_count}")
-    print(f"  Failed: {fail_count}")
+    with metrics.phase("upload", profiled=True), \
+            Report.Progress("Articles", len(to_send), concurrency_status(limiter)) as progress:
+        journal_file = None
+        try:
+            journal_file = open_journal(folder_path)
+            for entry in invalid:
+                record_journal(journal_file, "article", entry["name"], None, False, error=entry["error"])
+            send_articles(base_url, to_send, handle_result, async_mode, concurrency, metrics, limiter)
+        finally:
+            close_journal(journal_file)
+            invalidate_listing(f"{base_url}/article")
+
+    if async_mode:
+        sort_in_folder_order(failed_files, manifest)
+
+    Report.info("\nARTICLE CREATION SUMMARY:")
+    Report.info(f"  Success: {success_count}")
+    Report.info(f"  Failed: {fail_count}")
+    Report.info(f"  Already created (per the journal): {skipped_count}")
+    if limiter is not None:
+        Report.info(f"  Adaptive: {limiter.describe()}")
     if failed_files:
-        print("  Failed files:")
+        Report.info("  Failed files:")
         for ff in failed_files:
-            print(f"    - {ff}")
+            Report.info(f"    - {ff}")
+
+    metrics.count("success", success_count)
+    metrics.count("failed", fail_count)
+    metrics.count("already_created", skipped_count)
+    metrics.report(metrics_path)
 
-    input("\nPress Enter to exit...")
+    pause(assume_yes)
+    return fail_count
+
+################################################################################
+# ARTICLES FROM NDJSON
+################################################################################
+
+# A single dump with one article (JSON object) per line, as produced by the
+# export pipeline, instead of one file per article. The dump is streamed: only
+# the current line is held in memory, whatever the size of the file. Outcomes
+# go to the journal of the folder holding the dump, keyed '<file>:<line>' and
+# fingerprinted with the SHA-256 of the line, so a rerun skips every line
+# already created even if lines moved since.
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+def is_ndjson_file(path):
+    return path.lower().endswith(NDJSON_EXTENSIONS) and os.path.isfile(path)
+
+def load_ndjson_journal(folder_path, source_name):
+    """
+    Returns (done, failed): the fingerprints of the lines of 'source_name'
+    that were created, and of those whose latest attempt failed. Only the
+    fingerprints are kept, so the journal of a large dump stays small.
+    """
+    done = set()
+    failed = set()
+    prefix = source_name + ":"
+    for entry in iter_journal(journal_path(folder_path)):
+        if entry.get("kind") != "article":
+            continue
+        if not str(entry["key"]).startswith(prefix) or not entry.get("fingerprint"):
+            continue
+        if entry["status"] == "done":
+            done.add(entry["fingerprint"])
+            failed.discard(entry["fingerprint"])
+        elif entry["status"] == "deleted":
+            done.discard(entry["fingerprint"])
+        elif entry["fingerprint"] not in done:
+            failed.add(entry["fingerprint"])
+    return done, failed
+
+def iter_ndjson_articles(path, metrics=None):
+    """
+    Yields (line number, fingerprint, payload, error, bytes read) for every
+    non-blank line of 'path', reading one line at a time. 'payload' is the
+    parsed and validated article, or None with 'error' set. Time spent on each of
+    SCAN_STEPS is added to 'metrics', if given.
+    """
+    with open(path, 'rb') as f:
+        line_number = 0
+        position = 0
+        while True:
+            start = time.perf_counter()
+            raw = f.readline()
+            if not raw:
+                break
+            line_number += 1
+            position += len(raw)
+            raw = raw.strip()
+            if not raw:
+                continue
+            fingerprint = hashlib.sha256(raw).hexdigest()
+            read_done = time.perf_counter()
+            try:
+                payload = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                add_scan_timings(metrics, (read_done - start, time.perf_counter() - read_done, 0.0))
+                yield line_number, fingerprint, None, "Invalid JSON format.", position
+                continue
+            parse_done = time.perf_counter()
+            is_valid, err_msg = validate_article_payload(payload)
+            add_scan_timings(metrics, (read_done - start, parse_done - read_done,
+                                       time.perf_counter() - parse_done))
+            if is_valid:
+                yield line_number, fingerprint, payload, None, position
+            else:
+                yield line_number, fingerprint, None, err_msg, position
+
+def create_articles_from_ndjson(path, brightmindid="", retry_failed_only=False, assume_yes=False,
+                                base_url=DEFAULT_BASE_URL, async_mode=False,
+                                concurrency=DEFAULT_ASYNC_CONCURRENCY, metrics_path=None, profile=None,
+                                adaptive=False):
+    """
+    Creates one article per line of the NDJSON/JSONL file 'path', streaming
+    it once. Lines are validated with validate_article_payload as they are
+    read; invalid ones are reported by line number, journaled as failed and
+    skipped. Memory stays flat however large the file is: records are read,
+    sent and dropped one by one, and only the journal fingerprints and the
+    numbers of failed lines are kept.
+
+    Journal, 'retry_failed_only', async/adaptive sending, metrics and the
+    summary work as in create_articles. Since the file is only read once,
+    the confirmation comes before validation rather than after it. Returns
+    the number of failures, or None if nothing was attempted.
+    """
+    folder_path = os.path.dirname(os.path.abspath(path))
+    source_name = os.path.basename(path)
+    try:
+        size = os.path.getsize(path)
+    except OSError as e:
+        Report.error(f"Cannot read '{path}': {e}")
+        return
+
+    Report.info(f"Articles will be streamed from '{source_name}' ({size / 1e6:.1f} MB), one per line.")
+
+    done, failed = load_ndjson_journal(folder_path, source_name)
+    if done:
+        Report.info(f"The journal lists {len(done)} line(s) of this file as already created.")
+    if not retry_failed_only:
+        retry_failed_only = ask_retry_failed_count(len(failed), "line(s)", assume_yes)
+
+    if not confirm("\nDo you want to proceed with creation of these articles? (yes/no): ", assume_yes):
+        Report.info("\nAborting article creation process.")
+        return
+
+    success_count = 0
+    fail_count = 0
+    skipped_count = 0
+    failed_lines = []
+    read_bytes = 0
+
+    metrics = RunMetrics("articles", profile=profile)
+    journal_file = None
+
+    limiter = None
+    if adaptive:
+        async_mode = True
+        limiter = AimdController(initial=min(ADAPTIVE_INITIAL, concurrency), maximum=concurrency)
+
+    def to_send():
+        # Lazily feeds the senders; runs on the thread (or event loop) that
+        # handles the results, so journal writes never interleave.
+        nonlocal fail_count, skipped_count, read_bytes
+        for line_number, fingerprint, payload, error, read_bytes in iter_ndjson_articles(path, metrics):
+            if retry_failed_only and fingerprint not in failed:
+                continue
+            key = f"{source_name}:{line_number}"
+            if error is not None:
+                Report.error(f"Skipping line {line_number} due to payload error: {error}")
+                fail_count += 1
+                failed_lines.append(line_number)
+                record_journal(journal_file, "article", key, fingerprint, False, error=error)
+                continue
+            if fingerprint in done:
+                skipped_count += 1
+                continue
+            payload["brightmindid"] = brightmindid
+            yield line_number, fingerprint, payload
+
+    def handle_result(line_number, fingerprint, response, error):
+        nonlocal success_count, fail_count
+        key = f"{source_name}:{line_number}"
+        if error is not None:
+            Report.error(f"Failed to send request for line {line_number}. Error: {error}. Skipping...")
+            fail_count += 1
+            failed_lines.append(line_number)
+            record_journal(journal_file, "article", key, fingerprint, False, error=str(error))
+        elif response.status_code == 201:
+            Report.item(f"Successfully created article from line {line_number}.")
+            success_count += 1
+            record_journal(journal_file, "article", key, fingerprint, True, server_id=created_id(response))
+        else:
+            error_detail = response.text
+            Report.error(f"Failed to create article from line {line_number}. "
+                         f"Status code: {response.status_code}. "
+                         f"Error detail: {error_detail}")
+            fail_count += 1
+            failed_lines.append(line_number)
+            record_journal(journal_file, "article", key, fingerprint, False,
+                           error=f"Status code: {response.status_code}. {error_detail}")
+        progress.advance(ok=error is None and response.status_code == 201)
+
+    def eta():
+        # From the share of the file read so far, which is known before the
+        # number of lines is.
+        elapsed = time.perf_counter() - started
+        return elapsed * (size - read_bytes) / read_bytes if read_bytes else None
+
+    started = time.perf_counter()
+    with metrics.phase("upload", profiled=True), \
+            Report.Progress("Articles", None, concurrency_status(limiter), eta) as progress:
+        try:
+            journal_file = open_journal(folder_path)
+            send_articles(base_url, to_send(), handle_result, async_mode, concurrency, metrics, limiter)
+        except OSError as e:
+            Report.error(f"Failed to read '{path}': {e}")
+            fail_count += 1
+        finally:
+            close_journal(journal_file)
+            invalidate_listing(f"{base_url}/article")
+
+    failed_lines.sort()
+
+    Report.info("\nARTICLE CREATION SUMMARY:")
+    Report.info(f"  Success: {success_count}")
+    Report.info(f"  Failed: {fail_count}")
+    Report.info(f"  Already created (per the journal): {skipped_count}")
+    if limiter is not None:
+        Report.info(f"  Adaptive: {limiter.describe()}")
+    if failed_lines:
+        Report.info("  Failed lines:")
+        for line_number in failed_lines:
+            Report.info(f"    - {source_name}:{line_number}")
+
+    metrics.count("success", success_count)
+    metrics.count("failed", fail_count)
+    metrics.count("already_created", skipped_count)
+    metrics.report(metrics_path)
+
+    pause(assume_yes)
+    return fail_count
 
 ################################################################################
 # MAIN MENU
@@ -518,5 +1404,207 @@ def main_menu():
         else:
             print("\nInvalid choice. Please try again.\n")
 
+################################################################################
+# COMMAND LINE
+################################################################################
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Create universities, casts and articles, or purge them, without the "
+                    "interactive menu. Run without arguments for the menu.")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, metavar="URL[,URL...]",
+                        help=f"backend base URL (default: {DEFAULT_BASE_URL}, or $DATASCRIPTS_BASE_URL); "
+                             "with several replicas, creates and deletes are spread over them")
+    parser.add_argument("--health-path", default="", metavar="PATH",
+                        help="path GET by health checks of replicas (default: the base URL itself)")
+    parser.add_argument("--yes", action="store_true",
+                        help="do not ask for confirmation (required for unattended runs)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write the run's timings and request metrics to FILE as JSON")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="profile CPU (cProfile) or memory (tracemalloc) of the scan and upload phases")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="print one line per item (-vv: also every payload sent)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="print errors only")
+    parser.add_argument("--log", metavar="FILE",
+                        help="append every message, including one line per item, to FILE")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    universities = commands.add_parser("universities", help="create universities from a folder of icons")
+    universities.add_argument("folder", help="folder containing the university icons")
+    universities.add_argument("--retry-failed", action="store_true",
+                              help="only retry icons that failed in the previous run")
+    universities.add_argument("--no-dedupe", action="store_true",
+                              help="upload icons even if the same content was uploaded before")
+
+    casts = commands.add_parser("casts", help="create casts from a folder of cast subfolders")
+    casts.add_argument("folder", help="folder containing one subfolder per cast")
+    casts.add_argument("--brightmindid", default="", help="brightmindid added to each cast")
+    casts.add_argument("--workers", type=int, default=DEFAULT_CAST_UPLOAD_WORKERS,
+                       help=f"parallel uploads (default: {DEFAULT_CAST_UPLOAD_WORKERS})")
+    casts.add_argument("--scan-processes", type=int, default=None,
+                       help="processes used to validate folders (default: one per CPU)")
+    casts.add_argument("--retry-failed", action="store_true",
+                       help="only retry folders that failed in the previous run")
+    casts.add_argument("--no-dedupe", action="store_true",
+                       help="upload videos even if the same content was uploaded before")
+    casts.add_argument("--adaptive", action="store_true",
+                       help="start at --workers and adjust uploads in flight to the backend's latency and errors")
+    casts.add_argument("--max-workers", type=int, default=DEFAULT_CAST_MAX_WORKERS,
+                       help=f"ceiling for --adaptive (default: {DEFAULT_CAST_MAX_WORKERS})")
+    casts.add_argument("--order", choices=SCHEDULE_ORDERS, default="largest",
+                       help="upload the largest videos first (default) or in folder order")
+    casts.add_argument("--bandwidth", type=float, default=None, metavar="MBPS",
+                       help="MB/s per upload used for the time estimate (default: rate measured in the last run)")
+    casts.add_argument("--plan", action="store_true",
+                       help="only print the upload plan (total size, estimated time) and exit")
+
+    articles = commands.add_parser("articles",
+                                   help="create articles from a folder of .json/.txt files or an NDJSON file")
+    articles.add_argument("folder", help="folder containing the article files, or an .ndjson/.jsonl file "
+                                         "with one article per line")
+    articles.add_argument("--brightmindid", default="", help="brightmindid added to each article")
+    articles.add_argument("--scan-processes", type=int, default=None,
+                          help="processes used to validate files (default: one per CPU)")
+    articles.add_argument("--retry-failed", action="store_true",
+                          help="only retry files that failed in the previous run")
+    articles.add_argument("--async", dest="async_mode", action="store_true",
+                          help="send articles concurrently with the asyncio client")
+    articles.add_argument("--concurrency", type=int, default=DEFAULT_ASYNC_CONCURRENCY,
+                          help=f"requests in flight with --async (default: {DEFAULT_ASYNC_CONCURRENCY})")
+    articles.add_argument("--adaptive", action="store_true",
+                          help="send asynchronously, adjusting requests in flight (up to --concurrency) "
+                               "to the backend's latency and errors")
+
+    purge = commands.add_parser("purge", help="delete every item of one type, or of all types")
+    purge.add_argument("type", choices=["cast", "article", "user", "university", "all"],
+                       help="'all' deletes casts and articles, then users and universities")
+    purge.add_argument("--workers", type=int, default=None, help="parallel deletes")
+    purge.add_argument("--rate", type=float, default=None, help="maximum deletes per second (0: unlimited)")
+    purge.add_argument("--pipeline", action="store_true",
+                       help="start deleting while the listing is still being fetched")
+    purge.add_argument("--dry-run", action="store_true", help="only list what would be deleted")
+    purge.add_argument("--adaptive", action="store_true",
+                       help="start at --workers and adjust deletes in flight to the backend's latency and errors")
+    purge.add_argument("--max-workers", type=int, default=None, help="ceiling for --adaptive")
+    purge.add_argument("--no-listing-cache", action="store_true",
+                       help="download the full listing even if a cached copy is still valid")
+
+    sync = commands.add_parser("sync", help="create missing and delete stale items so the server matches a folder")
+    sync.add_argument("type", choices=["university", "cast", "article"])
+    sync.add_argument("folder", help="folder laid out as for the matching create command")
+    sync.add_argument("--brightmindid", default="", help="brightmindid added to created casts/articles")
+    sync.add_argument("--dry-run", action="store_true", help="only show what would be created and deleted")
+    sync.add_argument("--keep-stale", action="store_true", help="create missing items but delete nothing")
+    sync.add_argument("--workers", type=int, default=None, help="parallel deletes")
+    sync.add_argument("--rate", type=float, default=None, help="maximum deletes per second (0: unlimited)")
+    sync.add_argument("--scan-processes", type=int, default=None,
+                      help="processes used to validate the folder (default: one per CPU)")
+    sync.add_argument("--no-listing-cache", action="store_true",
+                      help="download the full listing even if a cached copy is still valid")
+
+    watch = commands.add_parser("watch",
+                                help="upload new cast subfolders or article files as they land in a folder")
+    watch.add_argument("type", choices=["cast", "article"])
+    watch.add_argument("folder", help="folder laid out as for the matching create command")
+    watch.add_argument("--brightmindid", default="", help="brightmindid added to each cast/article")
+    watch.add_argument("--workers", type=int, default=None, help="uploads running at once")
+    watch.add_argument("--settle", type=float, default=None,
+                       help="seconds an item must stay unchanged before it is uploaded")
+    watch.add_argument("--poll", action="store_true", help="poll the folder instead of using inotify")
+    watch.add_argument("--poll-interval", type=float, default=None, help="seconds between two polls")
+    watch.add_argument("--run-for", type=float, default=None, help="stop after this many seconds")
+    watch.add_argument("--no-dedupe", action="store_true",
+                       help="upload videos even if the same content was uploaded before")
+    return parser
+
+def main(argv=None):
+    """
+    Entry point. Without arguments, shows the interactive menu; otherwise
+    runs one command headless and returns a process exit code.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        main_menu()
+        return 0
+
+    args = build_parser().parse_args(argv)
+    verbosity = Report.QUIET if args.quiet else min(Report.NORMAL + args.verbose, Report.DEBUG)
+    Report.configure(verbosity, args.log)
+    urls = [url.strip().rstrip("/") for url in args.base_url.split(",") if url.strip()]
+    if not urls:
+        Report.error("Invalid base URL.")
+        return 2
+    args.base_url = urls[0]
+    ndjson_input = args.command == "articles" and is_ndjson_file(args.folder)
+    if args.command != "purge" and not ndjson_input and not os.path.isdir(args.folder):
+        Report.error(f"Invalid folder path: {args.folder}")
+        return 2
+    endpoints = use_endpoints(urls, args.health_path) if len(urls) > 1 else None
+
+    common = {"assume_yes": args.yes, "base_url": args.base_url,
+              "metrics_path": args.metrics, "profile": args.profile}
+    if args.command == "universities":
+        failures = create_universities(args.folder, retry_failed_only=args.retry_failed,
+                                       dedupe=not args.no_dedupe, **common)
+    elif args.command == "casts":
+        failures = create_casts(args.folder, args.brightmindid, workers=args.workers,
+                                retry_failed_only=args.retry_failed, scan_processes=args.scan_processes,
+                                dedupe=not args.no_dedupe, adaptive=args.adaptive, max_workers=args.max_workers,
+                                order=args.order, plan_only=args.plan,
+                                bandwidth=args.bandwidth * 1e6 if args.bandwidth else None, **common)
+    elif args.command == "articles":
+        failures = create_articles(args.folder, args.brightmindid, retry_failed_only=args.retry_failed,
+                                   scan_processes=args.scan_processes, async_mode=args.async_mode,
+                                   concurrency=args.concurrency, adaptive=args.adaptive, **common)
+    elif args.command == "watch":
+        import Watch
+        options = {}
+        if args.workers is not None:
+            options["workers"] = args.workers
+        if args.settle is not None:
+            options["settle"] = args.settle
+        if args.poll_interval is not None:
+            options["poll_interval"] = args.poll_interval
+        failures = Watch.watch_folder(args.type, args.folder, args.brightmindid, poll=args.poll,
+                                      run_for=args.run_for, dedupe=not args.no_dedupe, base_url=args.base_url,
+                                      metrics_path=args.metrics, **options)
+    elif args.command == "sync":
+        import Sync
+        options = {}
+        if args.workers is not None:
+            options["workers"] = args.workers
+        if args.rate is not None:
+            options["rate"] = args.rate
+        failures = Sync.sync_items(args.type, args.folder, args.brightmindid, dry_run=args.dry_run,
+                                   delete_stale=not args.keep_stale, scan_processes=args.scan_processes,
+                                   assume_yes=args.yes, base_url=args.base_url, metrics_path=args.metrics,
+                                   use_listing_cache=not args.no_listing_cache, **options)
+    else:
+        import Purge
+        options = dict(common)
+        if args.workers is not None:
+            options["workers"] = args.workers
+        if args.rate is not None:
+            options["rate"] = args.rate
+        if args.max_workers is not None:
+            options["max_workers"] = args.max_workers
+        if args.type == "all":
+            if args.pipeline:
+                Report.error("--pipeline does not apply to 'purge all'.")
+                return 2
+            failures = Purge.purge_all(dry_run=args.dry_run, adaptive=args.adaptive,
+                                       use_listing_cache=not args.no_listing_cache, **options)
+        else:
+            failures = Purge.purge_items(args.type, pipeline=args.pipeline, dry_run=args.dry_run,
+                                         adaptive=args.adaptive, use_listing_cache=not args.no_listing_cache,
+                                         **options)
+
+    if endpoints is not None:
+        Report.info("\nREPLICAS:")
+        for line in endpoints.describe():
+            Report.info(f"  {line}")
+    return 1 if failures else 0
+
 if __name__ == "__main__":
-    main_menu()
+    sys.exit(main())
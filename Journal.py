@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+import Report
+
+################################################################################
+# INGESTION JOURNAL
+################################################################################
+
+# Append-only JSON-lines file per content folder, kept in JOURNAL_DIR under
+# the SHA-1 of the folder's absolute path, so read-only and network folders
+# get one too. Each line records the outcome of one item, so a rerun can skip
+# what already succeeded. Purges append a "deleted" line for every journaled
+# item they delete (forget_journal_ids), so it is created again next time.
+JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".datascripts", "journals")
+
+def journal_path(folder_path):
+    folder = os.path.abspath(folder_path)
+    return os.path.join(JOURNAL_DIR, hashlib.sha1(folder.encode("utf-8")).hexdigest() + ".jsonl")
+
+def iter_journal(path):
+    """
+    Yields the entries (dicts) of the journal at 'path'. A missing journal
+    yields nothing, and a truncated last line (crash mid-write) is ignored.
+    """
+    try:
+        jf = open(path, 'r', encoding='utf-8')
+    except OSError:
+        return
+    with jf:
+        for line in jf:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and "key" in entry:
+                yield entry
+
+def load_journal(folder_path, kind):
+    """
+    Returns {key: latest journal entry} for the given kind ('cast', 'article'
+    or 'university'). Later lines override earlier ones.
+    """
+    return {entry["key"]: entry for entry in iter_journal(journal_path(folder_path))
+            if entry.get("kind") == kind}
+
+def open_journal(folder_path):
+    """
+    Opens the journal of 'folder_path' for appending. If it cannot be
+    written, warns and returns None: the run goes on without journaling.
+    """
+    path = journal_path(folder_path)
+    try:
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        return open(path, 'a', encoding='utf-8')
+    except OSError as e:
+        Report.warning(f"Warning: could not open the journal, outcomes will not be recorded: {e}")
+        return None
+
+def close_journal(journal_file):
+    if journal_file is not None:
+        journal_file.close()
+
+def record_journal(journal_file, kind, key, fingerprint, ok, server_id=None, error=None):
+    """
+    Appends one outcome to the journal and flushes it immediately, so the
+    entry survives if the run is killed right after. Does nothing without a
+    journal (see open_journal). A success without a server id is not
+    journaled: a purge could never clear it (see forget_journal_ids), so the
+    item would be skipped as already created forever.
+    """
+    if journal_file is None:
+        return
+    if ok and server_id is None:
+        Report.warning(f"Warning: the server returned no id for {kind} '{key}'; "
+                       "it is not journaled and a rerun will create it again.")
+        return
+    entry = {
+        "kind": kind,
+        "key": key,
+        "fingerprint": fingerprint,
+        "status": "done" if ok else "failed",
+        "id": server_id,
+        "error": error,
+        "time": datetime.now(timezone.utc).isoformat(),
+    }
+    journal_file.write(json.dumps(entry) + "\n")
+    journal_file.flush()
+
+def forget_journal_ids(kind, ids, journal_dir=JOURNAL_DIR):
+    """
+    Marks the journaled items of 'kind' whose server id is in 'ids' as
+    deleted in every journal, e.g. after a purge, so the next run creates
+    them again. Failing to update a journal only costs a warning.
+    """
+    ids = set(ids)
+    if not ids or not os.path.isdir(journal_dir):
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    for name in os.listdir(journal_dir):
+        if not name.endswith(".jsonl"):
+            continue
+        path = os.path.join(journal_dir, name)
+        latest = {}
+        for entry in iter_journal(path):
+            if entry.get("kind") == kind:
+                latest[entry["key"]] = entry
+        deleted = [entry for entry in latest.values() if entry.get("status") == "done" and entry.get("id") in ids]
+        if not deleted:
+            continue
+        try:
+            with open(path, 'a', encoding='utf-8') as jf:
+                for entry in deleted:
+                    jf.write(json.dumps({"kind": kind, "key": entry["key"], "fingerprint": entry["fingerprint"],
+                                         "status": "deleted", "id": entry["id"], "error": None,
+                                         "time": now}) + "\n")
+        except OSError as e:
+            Report.warning(f"Warning: could not update journal {path}: {e}")
+
+def is_journaled_done(journal, key, fingerprint):
+    entry = journal.get(key)
+    return entry is not None and entry["status"] == "done" and entry["fingerprint"] == fingerprint
+
+def is_journaled_failed(journal, key):
+    entry = journal.get(key)
+    return entry is not None and entry["status"] == "failed"
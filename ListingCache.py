@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import Report
+from Storage import write_atomic
+
+################################################################################
+# LISTING CACHE
+################################################################################
+
+# Local copy of the last complete listing of each collection URL, so repeated
+# purges, dry runs and syncs do not download an unchanged collection again.
+# Purge.iter_items revalidates every cached page with If-None-Match /
+# If-Modified-Since; a 304 means the page is read back from here. When the
+# server sent no validators, a listing younger than the TTL is reused without
+# any request. Our own creates and deletes drop the listing they affect.
+#
+# Per collection URL, two files in LISTING_CACHE_DIR:
+#   <sha1>.json          {"url", "fetched_at", "items_file",
+#                         "pages": [{"url", "etag", "last_modified", "next", "count"}]}
+#   <sha1>-<uuid>.jsonl  every item of every page, one JSON object per line
+# Items stay on disk and are streamed back, so a large collection is never
+# held in memory.
+
+LISTING_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".datascripts", "listings")
+
+# Seconds a listing without ETag/Last-Modified is trusted without asking.
+DEFAULT_LISTING_TTL = 60
+
+class ListingCacheError(Exception):
+    """
+    Raised when a cached listing cannot be read back.
+    """
+
+def _meta_path(url, cache_dir):
+    return os.path.join(cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+def load_listing(url, cache_dir=LISTING_CACHE_DIR):
+    """
+    Returns the cached metadata of 'url' (see above), or None if there is no
+    usable cached listing.
+    """
+    try:
+        with open(_meta_path(url, cache_dir), 'r', encoding='utf-8') as f:
+            meta = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("url") != url:
+        return None
+    if not os.path.isfile(os.path.join(cache_dir, meta.get("items_file", ""))):
+        return None
+    return meta
+
+def has_validators(meta):
+    return all(page.get("etag") or page.get("last_modified") for page in meta["pages"])
+
+def is_fresh(meta, ttl=DEFAULT_LISTING_TTL):
+    return time.time() - meta["fetched_at"] < ttl
+
+class CachedItems:
+    """
+    Forward-only reader over the items of a cached listing. read(n) yields the
+    next n items, skip(n) passes over them. Pages normally come back in the
+    same order, so one reader serves a whole listing.
+    """
+
+    def __init__(self, meta, cache_dir=LISTING_CACHE_DIR):
+        try:
+            self._file = open(os.path.join(cache_dir, meta["items_file"]), 'r', encoding='utf-8')
+        except OSError as e:
+            raise ListingCacheError(str(e))
+        self.position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def read(self, count):
+        for _ in range(count):
+            try:
+                line = self._file.readline()
+                item = json.loads(line) if line else None
+            except (OSError, ValueError) as e:
+                raise ListingCacheError(str(e))
+            if line == "":
+                raise ListingCacheError("Cached listing is shorter than its metadata says.")
+            self.position += 1
+            yield item
+
+    def skip(self, count):
+        for _ in self.read(count):
+            pass
+
+    def close(self):
+        self._file.close()
+
+class ListingWriter:
+    """
+    Collects a fresh listing while it is streamed and, on commit(), makes it
+    the cached listing of 'url'. Dropped without commit (e.g. the listing
+    failed half-way), it leaves the previous cache as it was.
+    """
+
+    def __init__(self, url, cache_dir=LISTING_CACHE_DIR):
+        self.url = url
+        self.cache_dir = cache_dir
+        self.pages = []
+        self._items_file = None
+        self._file = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._items_file = f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}-{uuid.uuid4().hex}.jsonl"
+            self._file = open(os.path.join(cache_dir, self._items_file), 'w', encoding='utf-8')
+        except OSError as e:
+            Report.warning(f"Warning: could not write listing cache: {e}")
+
+    def add_page(self, url, etag, last_modified, next_url):
+        self.pages.append({"url": url, "etag": etag, "last_modified": last_modified,
+                           "next": next_url, "count": 0})
+
+    def add_item(self, item):
+        self.pages[-1]["count"] += 1
+        if self._file is not None:
+            self._file.write(json.dumps(item, separators=(",", ":")) + "\n")
+
+    def commit(self):
+        if self._file is None:
+            return
+        old = load_listing(self.url, self.cache_dir)
+        meta = {"url": self.url, "fetched_at": time.time(), "items_file": self._items_file, "pages": self.pages}
+        meta_path = _meta_path(self.url, self.cache_dir)
+        try:
+            self._file.close()
+        except OSError as e:
+            Report.warning(f"Warning: could not write listing cache: {e}")
+            self.discard()
+            return
+        if not write_atomic(meta_path, json.dumps(meta), "listing cache"):
+            self.discard()
+            return
+        self._file = None
+        if old is not None and old["items_file"] != self._items_file:
+            _remove(os.path.join(self.cache_dir, old["items_file"]))
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            _remove(os.path.join(self.cache_dir, self._items_file))
+            self._file = None
+
+def invalidate_listing(url, cache_dir=LISTING_CACHE_DIR):
+    """
+    Drops the cached listing of 'url', e.g. after items were created in or
+    deleted from that collection.
+    """
+    meta = load_listing(url, cache_dir)
+    _remove(_meta_path(url, cache_dir))
+    if meta is not None:
+        _remove(os.path.join(cache_dir, meta["items_file"]))
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
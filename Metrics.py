@@ -0,0 +1,215 @@
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import Report
+
+################################################################################
+# RUN METRICS
+################################################################################
+
+# Every create and purge run collects a RunMetrics: wall time per phase
+# (scan, dedupe, upload, ...) and, through ApiClient/AsyncApiClient, one
+# record per request (latency including retries, payload bytes sent, final
+# status). At the end of the run a summary with latency percentiles and
+# MB/s is printed and, if asked for, written to a JSON file.
+#
+#   metrics = RunMetrics("casts", profile="cpu")
+#   with metrics.phase("scan", profiled=True):
+#       manifest = scan_cast_folder(folder_path)
+#   client = ApiClient(base_url, metrics=metrics)
+#   ...
+#   metrics.report("casts-metrics.json")
+
+# Profiler modes accepted by RunMetrics(profile=...).
+PROFILE_MODES = ("cpu", "memory")
+
+# Lines of profiler output printed per profiled phase.
+PROFILE_TOP = 15
+
+class RunMetrics:
+    """
+    Thread-safe collector for one run. 'profile' ("cpu" or "memory") wraps
+    every phase entered with profiled=True in cProfile or tracemalloc; CPU
+    profiles are also saved as '<name>-<phase>.prof' in 'profile_dir'.
+    cProfile only sees the thread that entered the phase, so for thread-pool
+    uploads it profiles the dispatch loop, not the workers.
+    """
+
+    def __init__(self, name, profile=None, profile_dir="."):
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {profile!r}")
+        self.name = name
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+        self.phases = {}       # phase -> wall seconds
+        self.work = {}         # phase -> seconds summed over workers
+        self.counts = {}       # run outcome counters (success, failed, ...)
+        self.latencies = []    # seconds per request, retries included
+        self.statuses = {}     # final status (or exception name) -> count
+        self.request_count = 0
+        self.attempt_count = 0
+        self.bytes_sent = 0
+        self._first_request = None
+        self._last_response = None
+
+    @contextmanager
+    def phase(self, name, profiled=False):
+        """
+        Times the enclosed block as phase 'name' (repeated phases add up).
+        """
+        profiler = None
+        started_tracing = False
+        if profiled and self.profile == "cpu":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif profiled and self.profile == "memory" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            if profiler is not None:
+                profiler.disable()
+                self._print_cpu_profile(name, profiler)
+            elif started_tracing:
+                self._print_memory_profile(name)
+                tracemalloc.stop()
+
+    def add_work(self, name, seconds):
+        """
+        Adds time spent on 'name' by a worker (e.g. JSON parsing in scan
+        processes). These can exceed wall time when workers run in parallel.
+        """
+        with self._lock:
+            self.work[name] = self.work.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def record_request(self, method, status, started, bytes_sent, attempts=1):
+        """
+        Records one request (all its attempts). 'status' is the final HTTP
+        status, or the name of the exception that ended it; 'started' is the
+        time.perf_counter() value taken before the first attempt.
+        """
+        now = time.perf_counter()
+        key = str(status)
+        with self._lock:
+            self.latencies.append(now - started)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            self.request_count += 1
+            self.attempt_count += attempts
+            self.bytes_sent += bytes_sent
+            if self._first_request is None or started < self._first_request:
+                self._first_request = started
+            if self._last_response is None or now > self._last_response:
+                self._last_response = now
+
+    def summary(self):
+        """
+        Returns everything collected as a JSON-serialisable dict.
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            window = (self._last_response - self._first_request) if latencies else 0.0
+            return {
+                "run": self.name,
+                "started": self.started.isoformat(),
+                "elapsed": time.perf_counter() - self._start,
+                "phases": dict(self.phases),
+                "work": dict(self.work),
+                "counts": dict(self.counts),
+                "requests": {
+                    "count": self.request_count,
+                    "attempts": self.attempt_count,
+                    "statuses": dict(self.statuses),
+                    "bytes_sent": self.bytes_sent,
+                    "mb_per_s": self.bytes_sent / window / 1e6 if window > 0 else 0.0,
+                    "requests_per_s": len(latencies) / window if window > 0 else 0.0,
+                    "latency": {
+                        "p50": percentile(latencies, 50),
+                        "p95": percentile(latencies, 95),
+                        "p99": percentile(latencies, 99),
+                        "max": latencies[-1] if latencies else None,
+                        "mean": sum(latencies) / len(latencies) if latencies else None,
+                    },
+                },
+            }
+
+    def print_summary(self, summary=None):
+        summary = summary or self.summary()
+        Report.info(f"\nRUN METRICS ({self.name}, {summary['elapsed']:.2f} s):")
+        if summary["phases"]:
+            Report.info("  Phases: " + " | ".join(f"{k} {v:.2f} s" for k, v in summary["phases"].items()))
+        if summary["work"]:
+            Report.info("  Worker time: " + " | ".join(f"{k} {v:.2f} s" for k, v in summary["work"].items()))
+        requests = summary["requests"]
+        if not requests["count"]:
+            return
+        statuses = ", ".join(f"{k} x{v}" for k, v in sorted(requests["statuses"].items()))
+        retries = requests["attempts"] - requests["count"]
+        Report.info(f"  Requests: {requests['count']} ({retries} retries), "
+                    f"{requests['requests_per_s']:.1f}/s; {statuses}")
+        latency = requests["latency"]
+        Report.info(f"  Latency: p50 {latency['p50'] * 1000:.1f} ms | p95 {latency['p95'] * 1000:.1f} ms | "
+                    f"p99 {latency['p99'] * 1000:.1f} ms | max {latency['max'] * 1000:.1f} ms")
+        Report.info(f"  Sent: {requests['bytes_sent'] / 1e6:.2f} MB at {requests['mb_per_s']:.2f} MB/s")
+
+    def report(self, metrics_path=None):
+        """
+        Prints the summary and, if 'metrics_path' is set, writes it as JSON.
+        """
+        summary = self.summary()
+        self.print_summary(summary)
+        if metrics_path:
+            try:
+                with open(metrics_path, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps(summary, indent=2))
+                Report.info(f"  Metrics written to {metrics_path}")
+            except OSError as e:
+                Report.warning(f"Warning: could not write metrics file: {e}")
+        return summary
+
+    def _print_cpu_profile(self, phase_name, profiler):
+        path = os.path.join(self.profile_dir, f"{self.name}-{phase_name}.prof")
+        try:
+            profiler.dump_stats(path)
+        except OSError as e:
+            Report.warning(f"Warning: could not write profile: {e}")
+            path = None
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        Report.info(f"\nCPU PROFILE ({phase_name})" + (f", saved to {path}:" if path else ":"))
+        Report.info(out.getvalue())
+
+    def _print_memory_profile(self, phase_name):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        Report.info(f"\nMEMORY PROFILE ({phase_name}): current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+            Report.info(f"  {stat}")
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list (None when empty).
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
@@ -1,73 +1,618 @@
+import json
+import time
+import codecs
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from Client import ApiClient, AimdController, DEFAULT_BASE_URL
+from ContentIndex import forget_ids
+from Journal import forget_journal_ids
+from Metrics import RunMetrics
+import Report
+from Report import confirm, pause
+from ListingCache import (DEFAULT_LISTING_TTL, ListingCacheError, CachedItems, ListingWriter, load_listing,
+                          has_validators, is_fresh, invalidate_listing)
 
-def purge_items(item_type):
-    if item_type == "cast":
-        base_url = "http://3.17.219.54/cast"
-        item_name = "casts"
-        id_field = "_id"
-        display_field = "_id"
-    elif item_type == "article":
-        base_url = "http://3.17.219.54/article"
-        item_name = "articles"
-        id_field = "_id"
-        display_field = "_id"
-    elif item_type == "user":
-        base_url = "http://3.17.219.54/user"
-        item_name = "users"
-        id_field = "_id"
-        display_field = "username"
-    elif item_type == "university":
-        base_url = "http://3.17.219.54/university"
-        item_name = "universities"
-        id_field = "_id"
-        display_field = "displayedName"
-    else:
-        print("Invalid item type.")
-        return
+# Number of DELETE requests kept in flight at once.
+DEFAULT_DELETE_WORKERS = 8
+
+# Ceiling for deletes in flight when the adaptive controller sets the level.
+DEFAULT_DELETE_MAX_WORKERS = 64
+
+# Upper bound on deletes per second across all workers (0 disables the limit).
+DEFAULT_DELETE_RATE = 50
+
+# Order in which purge_all deletes collections, one tier at a time, every
+# collection of a tier in parallel: casts and articles refer to their
+# university and author, so they go before users and universities.
+PURGE_TIERS = (("cast", "article"), ("user", "university"))
+
+# Bytes pulled from the socket at a time while streaming a listing.
+LISTING_CHUNK_SIZE = 64 * 1024
+
+# Collections of the backend, served at /<type>:
+#   type -> (plural name, id field, field shown to the operator)
+ITEM_TYPES = {
+    "cast": ("casts", "_id", "_id"),
+    "article": ("articles", "_id", "_id"),
+    "user": ("users", "_id", "username"),
+    "university": ("universities", "_id", "displayedName"),
+}
+
+# Characters that may end an element of a JSON array, and those that may
+# still continue a number.
+JSON_DELIMITERS = frozenset([",", "]", " ", "\t", "\r", "\n"])
+JSON_NUMBER_CHARS = frozenset("0123456789.eE+-")
 
-    print(f"\nFetching all {item_name}...")
-    response = requests.get(base_url)
-    if response.status_code != 200:
-        print(f"Failed to fetch {item_name}. Status code: {response.status_code}")
+class ListingError(Exception):
+    """
+    Raised when a collection listing cannot be fetched or parsed.
+    """
+
+def iter_json_array(chunks):
+    """
+    Incrementally parses a JSON array delivered as an iterable of byte chunks
+    and yields its elements one by one, so only the element being parsed and
+    the current chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+    expect_value = True  # False once an element was read and ',' or ']' must follow
+    after_comma = False  # a ',' was read, so an element (not ']') must follow
+    finished = False
+
+    def skip_ws(i):
+        while i < len(buf) and buf[i] in " \t\r\n":
+            i += 1
+        return i
+
+    for chunk in chunks:
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        while True:
+            pos = skip_ws(pos)
+            if pos >= len(buf):
+                break
+            if finished:
+                raise ListingError("Unexpected data after the end of the JSON array.")
+            if not started:
+                if buf[pos] != "[":
+                    raise ListingError("Unexpected response format: expected a list.")
+                started = True
+                pos += 1
+                continue
+            if not expect_value:
+                if buf[pos] == ",":
+                    expect_value = True
+                    after_comma = True
+                    pos += 1
+                    continue
+                if buf[pos] == "]":
+                    finished = True
+                    pos += 1
+                    continue
+                raise ListingError(f"Malformed JSON array near: {buf[pos:pos + 40]!r}")
+            if buf[pos] == "]":
+                if after_comma:
+                    raise ListingError(f"Malformed JSON array near: {buf[max(0, pos - 20):pos + 20]!r}")
+                finished = True
+                pos += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet; wait for more data
+            if not isinstance(value, (dict, list, str)) and buf[end:end + 1] not in JSON_DELIMITERS:
+                # A number or literal is only complete once a delimiter
+                # follows: "3" may still become "3.5e10" with the next chunk.
+                if all(c in JSON_NUMBER_CHARS for c in buf[end:]):
+                    break
+                raise ListingError(f"Malformed JSON array near: {buf[pos:pos + 40]!r}")
+            yield value
+            pos = end
+            expect_value = False
+            after_comma = False
+
+    if not started:
+        raise ListingError("Unexpected response format: expected a list.")
+    if not finished:
+        raise ListingError("Truncated JSON array in listing.")
+
+def iter_items(client, url, use_cache=False, ttl=DEFAULT_LISTING_TTL):
+    """
+    Streams a collection listing and yields its items (dicts) one by one.
+    Follows 'Link: <...>; rel="next"' pagination when the server sends it.
+    Raises ListingError on a failed request, non-200 response or malformed body.
+
+    With 'use_cache', pages of the last complete listing (see ListingCache)
+    are revalidated with If-None-Match / If-Modified-Since and read back from
+    disk on a 304. A cached listing without validators is reused without any
+    request while younger than 'ttl' seconds. A listing streamed to the end
+    replaces the cached one.
+    """
+    cached = load_listing(url) if use_cache else None
+    if cached is not None and not has_validators(cached) and is_fresh(cached, ttl):
+        try:
+            with CachedItems(cached) as reader:
+                yield from reader.read(sum(page["count"] for page in cached["pages"]))
+        except ListingCacheError as e:
+            invalidate_listing(url)
+            raise ListingError(f"Cached listing is unreadable, run again: {e}")
         return
-    
-    items = response.json()
-    if not isinstance(items, list):
-        print("Unexpected response format: expected a list.")
+
+    # Offset of every cached page's first item in the cached items file.
+    cached_pages = {}
+    if cached is not None:
+        offset = 0
+        for page in cached["pages"]:
+            cached_pages[page["url"]] = (offset, page)
+            offset += page["count"]
+
+    listing_url = url
+    writer = ListingWriter(url) if use_cache else None
+    reader = None
+    complete = False
+    try:
+        while url:
+            offset, page = cached_pages.get(url, (None, None))
+            headers = {}
+            if page is not None:
+                if page["etag"]:
+                    headers["If-None-Match"] = page["etag"]
+                if page["last_modified"]:
+                    headers["If-Modified-Since"] = page["last_modified"]
+            try:
+                response = client.get(url, stream=True, headers=headers)
+            except requests.RequestException as e:
+                raise ListingError(f"Error: {e}")
+            try:
+                if response.status_code == 304 and page is not None:
+                    # Unchanged page: read it back from the cache.
+                    if reader is None or reader.position > offset:
+                        if reader is not None:
+                            reader.close()
+                        reader = CachedItems(cached)
+                    reader.skip(offset - reader.position)
+                    items = reader.read(page["count"])
+                    etag, last_modified, next_url = page["etag"], page["last_modified"], page["next"]
+                elif response.status_code == 200:
+                    items = iter_json_array(response.iter_content(LISTING_CHUNK_SIZE))
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    next_url = response.links.get("next", {}).get("url")
+                else:
+                    raise ListingError(f"Status code: {response.status_code}")
+
+                if writer is not None:
+                    writer.add_page(url, etag, last_modified, next_url)
+                for item in items:
+                    if isinstance(item, dict):
+                        if writer is not None:
+                            writer.add_item(item)
+                        yield item
+                url = next_url
+            except requests.RequestException as e:
+                raise ListingError(f"Connection lost while reading the listing: {e}")
+            except ListingCacheError as e:
+                invalidate_listing(listing_url)
+                raise ListingError(f"Cached listing is unreadable, run again: {e}")
+            finally:
+                response.close()
+        complete = True
+    finally:
+        if reader is not None:
+            reader.close()
+        if writer is not None:
+            if complete:
+                writer.commit()
+            else:
+                writer.discard()
+
+def iter_collection(client, url, id_field, display_field, use_cache=False):
+    """
+    Like iter_items, but yields only (id, display value) for each item
+    carrying 'id_field'; the rest of every item is dropped immediately.
+    """
+    for item in iter_items(client, url, use_cache=use_cache):
+        if id_field in item:
+            yield item[id_field], item.get(display_field, "(no value)")
+
+def stop_on_listing_error(items, errors):
+    """
+    Passes 'items' through, but ends the stream on ListingError instead of
+    raising, recording the message in 'errors'. Lets deletes already in
+    flight finish and be reported when the listing breaks mid-way.
+    """
+    try:
+        yield from items
+    except ListingError as e:
+        errors.append(str(e))
+
+def listing_reporter(dry_run):
+    """
+    Returns the Report function for the lines of a fetched listing. The full
+    listing is only worth printing when it is all the run does.
+    """
+    return Report.info if dry_run else Report.item
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: 'rate' tokens are added per second, up to
+    'capacity'. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+def delete_item(client, bucket, delete_url):
+    """
+    Sends one DELETE, waiting for the rate limiter first. Runs in a worker
+    thread and returns the status code (or the exception raised).
+    """
+    if bucket is not None:
+        bucket.acquire()
+    try:
+        return client.delete(delete_url).status_code
+    except Exception as e:
+        return e
+
+def delete_all(base_url, item_type, results, workers=DEFAULT_DELETE_WORKERS, rate=DEFAULT_DELETE_RATE,
+               metrics=None, limiter=None, bucket=None, progress=None):
+    """
+    Deletes every (id, display value) in 'results' using 'workers' threads
+    over one pooled ApiClient, at most 'rate' deletes per second.
+    'results' may be any iterable: only a bounded window of items is pending
+    at a time. Reporting happens on the calling thread. Requests are
+    recorded in 'metrics', if given. With 'limiter' (an AimdController),
+    'workers' is only the ceiling and the limiter sets the deletes in flight.
+    'bucket' (a TokenBucket) and 'progress' (a Report.Progress), if given,
+    are shared with other delete_all calls running at the same time and
+    replace 'rate' and this call's own progress line.
+    A 404 means the item is already gone (deleted by another run, or by an
+    earlier attempt whose response was lost); it is not a failure, but it is
+    kept apart from the items this call deleted.
+    Returns (deleted_ids, failed, gone_ids) where 'failed' lists the display
+    values.
+    """
+    if progress is None:
+        total = len(results) if isinstance(results, list) else None
+        status = (lambda: f"concurrency {limiter.limit}") if limiter is not None else None
+        with Report.Progress(f"Deleting {ITEM_TYPES[item_type][0]}", total, status) as progress:
+            return delete_all(base_url, item_type, results, workers, rate, metrics, limiter, bucket, progress)
+
+    workers = max(1, int(workers))
+    if bucket is None and rate:
+        bucket = TokenBucket(rate)
+    client = ApiClient(pool_size=workers, metrics=metrics, limiter=limiter)
+    deleted_ids = []
+    failed = []
+    gone_ids = []
+
+    def report(future):
+        iid, dval = pending.pop(future)
+        outcome = future.result()
+        if outcome == 200:
+            Report.item(f"Successfully deleted {item_type}: {dval}")
+            deleted_ids.append(iid)
+        elif outcome == 404:
+            Report.item(f"Already deleted {item_type}: {dval}")
+            gone_ids.append(iid)
+        elif isinstance(outcome, Exception):
+            Report.error(f"Failed to delete {item_type} {dval}. Error: {outcome}")
+            failed.append(dval)
+        else:
+            Report.error(f"Failed to delete {item_type} {dval}. Status code: {outcome}")
+            failed.append(dval)
+        progress.advance(ok=outcome in (200, 404))
+
+    pending = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for iid, dval in results:
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        report(future)
+                future = executor.submit(delete_item, client, bucket, f"{base_url}/{iid}")
+                pending[future] = (iid, dval)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(future)
+    finally:
+        client.close()
+        # Deleted content must be uploadable again, so drop it from the index
+        # and the journals.
+        forget_ids(item_type, deleted_ids + gone_ids)
+        forget_journal_ids(item_type, deleted_ids + gone_ids)
+        if deleted_ids or gone_ids:
+            invalidate_listing(base_url)
+
+    return deleted_ids, failed, gone_ids
+
+def purge_items(item_type, workers=DEFAULT_DELETE_WORKERS, rate=DEFAULT_DELETE_RATE, pipeline=False,
+                assume_yes=False, base_url=DEFAULT_BASE_URL, metrics_path=None, profile=None,
+                dry_run=False, use_listing_cache=True, adaptive=False, max_workers=DEFAULT_DELETE_MAX_WORKERS):
+    """
+    Deletes every item of 'item_type'. The listing is streamed and only the
+    id/display value of each item is kept.
+
+    By default the whole listing is shown before the operator confirms. With
+    'pipeline', the operator confirms first and deletes start while the
+    listing is still arriving; the listing is repeated until a pass deletes
+    nothing, since deleting while paging can shift items past the cursor.
+    With 'dry_run', the listing is shown and nothing is deleted. With
+    'adaptive', 'workers' is the starting level of an AimdController that
+    raises deletes in flight up to 'max_workers' while the backend keeps up
+    and cuts them on 429/5xx, errors or latency spikes.
+
+    With 'use_listing_cache', an unchanged collection is not downloaded
+    again (see ListingCache); deletes drop the cached listing.
+
+    Listing and delete timings, latency percentiles and request rates are
+    printed at the end ('metrics_path' also saves them as JSON); 'profile'
+    ("cpu" or "memory") profiles the listing and delete phases.
+
+    With 'assume_yes' nothing is asked, so it can run headless. Returns the
+    number of failures, or None if nothing was attempted.
+    """
+    root_url = base_url
+    if item_type not in ITEM_TYPES:
+        Report.error("Invalid item type.")
         return
-    
-    # Extract IDs and display values
+    item_name, id_field, display_field = ITEM_TYPES[item_type]
+    base_url = f"{root_url}/{item_type}"
+
+    metrics = RunMetrics(f"purge-{item_type}", profile=profile)
+    limiter = None
+    if adaptive:
+        limiter = AimdController(initial=workers, maximum=max(workers, max_workers))
+        workers = limiter.maximum
+
+    if pipeline and not dry_run:
+        question = (f"\nDo you want to proceed with deletion of ALL {item_name}? "
+                    "Deletes start while the listing is streamed. (yes/no): ")
+        if not confirm(question, assume_yes):
+            Report.info("\nAborting deletion process.")
+            return
+
+        Report.info(f"\nFetching and deleting all {item_name}...")
+        listing_errors = []
+        deleted = 0
+        gone = set()
+        with metrics.phase("list+delete", profiled=True):
+            client = ApiClient(root_url, pool_size=1, metrics=metrics)
+            try:
+                # Deleting while paging can shift items past the cursor, so list
+                # again until a pass deletes nothing. Items that keep failing are
+                # what is left in 'failed' after the last pass; items that keep
+                # answering 404 (a lagging listing) do not count as deleted, or
+                # the loop would never end.
+                while True:
+                    results = stop_on_listing_error(
+                        iter_collection(client, base_url, id_field, display_field, use_listing_cache),
+                        listing_errors)
+                    pass_deleted, failed, pass_gone = delete_all(base_url, item_type, results, workers=workers,
+                                                                 rate=rate, metrics=metrics, limiter=limiter)
+                    deleted += len(pass_deleted)
+                    gone.update(pass_gone)
+                    if not pass_deleted or listing_errors:
+                        break
+                    Report.info(f"Listing {item_name} again to catch items shifted by pagination...")
+            finally:
+                client.close()
+
+        for err in listing_errors:
+            Report.error(f"Failed to fetch {item_name}. {err}")
+        Report.info(f"\nDeletion process for {item_name} completed.")
+        Report.info(f"  Deleted: {deleted}")
+        Report.info(f"  Already gone: {len(gone)}")
+        Report.info(f"  Failed: {len(failed)}")
+        if limiter is not None:
+            Report.info(f"  Adaptive: {limiter.describe()}")
+        metrics.count("deleted", deleted)
+        metrics.count("gone", len(gone))
+        metrics.count("failed", len(failed))
+        metrics.report(metrics_path)
+        Report.info()
+        pause(assume_yes)
+        return len(failed) + len(listing_errors)
+
+    Report.info(f"\nFetching all {item_name}...")
+
+    # Stream the listing, keeping only compact (id, display value) pairs
     results = []
-    for item in items:
-        if id_field in item:
-            display_val = item.get(display_field, "(no value)")
-            results.append((item[id_field], display_val))
+    client = ApiClient(root_url, pool_size=1, metrics=metrics)
+    try:
+        with metrics.phase("list", profiled=True):
+            for iid, dval in iter_collection(client, base_url, id_field, display_field, use_listing_cache):
+                results.append((iid, dval))
+    except ListingError as e:
+        Report.error(f"Failed to fetch {item_name}. {e}")
+        return 1
+    finally:
+        client.close()
 
     if not results:
-        print(f"No {item_name} found. Nothing to delete.")
+        Report.info(f"No {item_name} found. Nothing to delete.")
         return
 
-    print(f"\n{len(results)} {item_name.capitalize()} found:")
+    Report.info(f"\n{len(results)} {item_name.capitalize()} found" + (":" if dry_run else "."))
+    show = listing_reporter(dry_run)
     for iid, dval in results:
-        print(f"  - {dval}")
+        show(f"  - {dval}")
+
+    if dry_run:
+        Report.info("\nDry run: nothing was deleted.")
+        metrics.report(metrics_path)
+        return 0
 
     # Prompt the operator to proceed
-    proceed = input(f"\nDo you want to proceed with deletion of all these {len(results)} {item_name}? (yes/no): ").strip().lower()
-    if proceed != "yes":
-        print("\nAborting deletion process.")
+    if not confirm(f"\nDo you want to proceed with deletion of all these {len(results)} {item_name}? (yes/no): ",
+                   assume_yes):
+        Report.info("\nAborting deletion process.")
         return
 
-    # Delete all items one by one
-    for iid, dval in results:
-        delete_url = f"{base_url}/{iid}"
-        del_response = requests.delete(delete_url)
-        if del_response.status_code == 200:
-            print(f"Successfully deleted {item_type}: {dval}")
-        else:
-            print(f"Failed to delete {item_type} {dval}. Status code: {del_response.status_code}")
-        
-    print(f"\nDeletion process for {item_name} completed.\n")
-    input("Press Enter to exit...")  # Added prompt here
+    # Delete all items in parallel, rate-limited
+    with metrics.phase("delete", profiled=True):
+        deleted_ids, failed, gone_ids = delete_all(base_url, item_type, results, workers=workers, rate=rate,
+                                                   metrics=metrics, limiter=limiter)
+    deleted = len(deleted_ids)
+
+    Report.info(f"\nDeletion process for {item_name} completed.")
+    Report.info(f"  Deleted: {deleted}")
+    Report.info(f"  Already gone: {len(gone_ids)}")
+    Report.info(f"  Failed: {len(failed)}")
+    if limiter is not None:
+        Report.info(f"  Adaptive: {limiter.describe()}")
+    metrics.count("deleted", deleted)
+    metrics.count("gone", len(gone_ids))
+    metrics.count("failed", len(failed))
+    metrics.report(metrics_path)
+    Report.info()
+    pause(assume_yes)
+    return len(failed)
+
+def fetch_collection(root_url, item_type, metrics=None, use_listing_cache=True):
+    """
+    Returns the (id, display value) of every item of 'item_type', listed
+    through a client of its own so several collections can be fetched at
+    once. Raises ListingError.
+    """
+    _, id_field, display_field = ITEM_TYPES[item_type]
+    with ApiClient(root_url, pool_size=1, metrics=metrics) as client:
+        return list(iter_collection(client, f"{root_url}/{item_type}", id_field, display_field,
+                                    use_listing_cache))
+
+def purge_all(workers=DEFAULT_DELETE_WORKERS, rate=DEFAULT_DELETE_RATE, assume_yes=False,
+              base_url=DEFAULT_BASE_URL, metrics_path=None, profile=None, dry_run=False,
+              use_listing_cache=True, adaptive=False, max_workers=DEFAULT_DELETE_MAX_WORKERS):
+    """
+    Deletes every item of every type in one run. All listings are fetched
+    at once and one confirmation covers them all; the collections are then
+    deleted tier by tier (PURGE_TIERS), those of a tier in parallel, so a
+    full reset takes about as long as the slowest collection of each tier.
+    If a tier leaves failures, the purge stops before the next one, so no
+    user or university is deleted from under remaining content. Nothing is
+    deleted unless every listing succeeded.
+
+    Each collection is deleted by 'workers' threads; the 'rate' limit and,
+    with 'adaptive', the AimdController are shared by the whole run. Other
+    options are as for purge_items. Returns the number of failures, or None
+    if nothing was attempted.
+    """
+    metrics = RunMetrics("purge-all", profile=profile)
+    limiter = None
+    if adaptive:
+        limiter = AimdController(initial=workers, maximum=max(workers, max_workers))
+        workers = limiter.maximum
+    item_types = [item_type for tier in PURGE_TIERS for item_type in tier]
+
+    Report.info(f"\nFetching all {', '.join(ITEM_TYPES[item_type][0] for item_type in item_types)}...")
+    listings = {}
+    listing_errors = {}
+    with metrics.phase("list", profiled=True), ThreadPoolExecutor(max_workers=len(item_types)) as executor:
+        futures = {executor.submit(fetch_collection, base_url, item_type, metrics, use_listing_cache): item_type
+                   for item_type in item_types}
+        for future, item_type in futures.items():
+            try:
+                listings[item_type] = future.result()
+            except ListingError as e:
+                listing_errors[item_type] = str(e)
+    if listing_errors:
+        for item_type, err in listing_errors.items():
+            Report.error(f"Failed to fetch {ITEM_TYPES[item_type][0]}. {err}")
+        Report.error("Nothing was deleted.")
+        return len(listing_errors)
+
+    total = sum(len(results) for results in listings.values())
+    if not total:
+        Report.info("Nothing found. Nothing to delete.")
+        return
+
+    def describe(item_types):
+        return ", ".join(f"{len(listings[item_type])} {ITEM_TYPES[item_type][0]}" for item_type in item_types)
+
+    Report.info(f"\n{total} items found" + (":" if dry_run else "."))
+    show = listing_reporter(dry_run)
+    for number, tier in enumerate(PURGE_TIERS, 1):
+        Report.info(f"  Tier {number}: {describe(tier)}")
+        for item_type in tier:
+            for iid, dval in listings[item_type]:
+                show(f"    - {item_type} {dval}")
+
+    if dry_run:
+        Report.info("\nDry run: nothing was deleted.")
+        metrics.report(metrics_path)
+        return 0
+
+    if not confirm(f"\nDo you want to proceed with deletion of ALL {total} items ({describe(item_types)})? "
+                   "(yes/no): ", assume_yes):
+        Report.info("\nAborting deletion process.")
+        return
+
+    bucket = TokenBucket(rate) if rate else None
+    status = (lambda: f"concurrency {limiter.limit}") if limiter is not None else None
+    deleted = {}
+    failed = {}
+    gone = {}
+    for number, tier in enumerate(PURGE_TIERS, 1):
+        tier_types = [item_type for item_type in tier if listings[item_type]]
+        if not tier_types:
+            continue
+        if any(failed.values()):
+            Report.error(f"\nNot deleting {describe(tier_types)}: items of an earlier tier could not be deleted.")
+            break
+        names = " and ".join(ITEM_TYPES[item_type][0] for item_type in tier_types)
+        tier_total = sum(len(listings[item_type]) for item_type in tier_types)
+        with metrics.phase(f"delete tier {number}", profiled=True), \
+                Report.Progress(f"Deleting {names}", tier_total, status) as progress, \
+                ThreadPoolExecutor(max_workers=len(tier_types)) as executor:
+            futures = {executor.submit(delete_all, f"{base_url}/{item_type}", item_type, listings[item_type],
+                                       workers, rate, metrics, limiter, bucket, progress): item_type
+                       for item_type in tier_types}
+        for future, item_type in futures.items():
+            deleted_ids, failed[item_type], gone_ids = future.result()
+            deleted[item_type] = len(deleted_ids)
+            gone[item_type] = len(gone_ids)
+
+    failures = sum(len(items) for items in failed.values())
+    Report.info("\nDeletion process for all items completed.")
+    for item_type in item_types:
+        item_name = ITEM_TYPES[item_type][0].capitalize()
+        if item_type in deleted:
+            Report.info(f"  {item_name}: {deleted[item_type]} deleted, {gone[item_type]} already gone, "
+                        f"{len(failed[item_type])} failed")
+        elif listings[item_type]:
+            Report.info(f"  {item_name}: {len(listings[item_type])} kept")
+    if limiter is not None:
+        Report.info(f"  Adaptive: {limiter.describe()}")
+    metrics.count("deleted", sum(deleted.values()))
+    metrics.count("gone", sum(gone.values()))
+    metrics.count("failed", failures)
+    metrics.report(metrics_path)
+    Report.info()
+    pause(assume_yes)
+    return failures
 
 
 if __name__ == "__main__":
@@ -79,7 +624,8 @@ if __name__ == "__main__":
     print("  2) Articles")
     print("  3) Users")
     print("  4) Universities")
-    choice = input("\nEnter the number of your choice (1, 2, 3 or 4): ").strip()
+    print("  5) Everything (casts and articles, then users and universities)")
+    choice = input("\nEnter the number of your choice (1, 2, 3, 4 or 5): ").strip()
 
     if choice == "1":
         purge_items("cast")
@@ -89,6 +635,8 @@ if __name__ == "__main__":
         purge_items("user")
     elif choice == "4":
         purge_items("university")
+    elif choice == "5":
+        purge_all()
     else:
         print("\nInvalid choice. Exiting without action.\n")
         input("Press Enter to exit...")
@@ -0,0 +1,218 @@
+import sys
+import time
+import atexit
+import threading
+from datetime import datetime
+
+################################################################################
+# REPORTING
+################################################################################
+
+# All output of the create, purge, sync and watch runs goes through here, so
+# a 100k-item run does not spend its time writing to the terminal. Every
+# message has a level, and the terminal shows those up to the verbosity:
+#   QUIET    errors and warnings only
+#   NORMAL   + headers, summaries and one live progress line per loop
+#   VERBOSE  + one line per item
+#   DEBUG    + payload dumps
+# With a log file (configure(log_path=...)), every message up to VERBOSE,
+# whatever the verbosity, is appended there with a timestamp through a large
+# buffer, so per-item detail is kept without slowing the run down.
+#
+#   with Report.Progress("Deleting casts", total=len(results)) as progress:
+#       for ...:
+#           Report.item(f"Deleted {name}")
+#           progress.advance(ok)
+
+QUIET = 0
+NORMAL = 1
+VERBOSE = 2
+DEBUG = 3
+
+LEVEL_NAMES = {QUIET: "ERROR", NORMAL: "INFO", VERBOSE: "ITEM", DEBUG: "DEBUG"}
+
+# Bytes buffered before the log file is written to.
+LOG_BUFFER_SIZE = 1024 * 1024
+
+# Seconds between two redraws of the progress line on a terminal, and
+# between two progress lines when the output is not a terminal.
+PROGRESS_REDRAW = 0.2
+PROGRESS_LOG_INTERVAL = 10.0
+
+_state = {"verbosity": NORMAL, "log": None, "live": None}
+_lock = threading.RLock()
+
+def configure(verbosity=NORMAL, log_path=None):
+    """
+    Sets the terminal verbosity and, with 'log_path', opens the log file
+    (appended to). Any previous log file is closed first.
+    """
+    close_log()
+    _state["verbosity"] = verbosity
+    if log_path:
+        try:
+            _state["log"] = open(log_path, 'a', encoding='utf-8', buffering=LOG_BUFFER_SIZE)
+        except OSError as e:
+            warning(f"Warning: could not open log file: {e}")
+
+def close_log():
+    with _lock:
+        log = _state["log"]
+        _state["log"] = None
+        if log is not None:
+            log.close()
+
+atexit.register(close_log)
+
+def is_enabled(level):
+    """
+    Whether messages of 'level' are shown or logged, to skip building
+    costly ones (payload dumps) for nothing.
+    """
+    return _state["verbosity"] >= level or (level <= VERBOSE and _state["log"] is not None)
+
+def emit(level, message, label=None):
+    with _lock:
+        log = _state["log"]
+        if log is not None and level <= max(VERBOSE, _state["verbosity"]) and message.strip():
+            stamp = datetime.now().isoformat(sep=" ", timespec="milliseconds")
+            log.write(f"{stamp} {label or LEVEL_NAMES[level]} {message.strip()}\n")
+        if _state["verbosity"] >= level:
+            live = _state["live"]
+            if live is not None:
+                live.clear()
+            print(message)
+            if live is not None:
+                live.draw(force=True)
+
+def error(message):
+    emit(QUIET, message)
+
+def warning(message):
+    emit(QUIET, message, "WARNING")
+
+def info(message=""):
+    emit(NORMAL, message)
+
+def item(message):
+    emit(VERBOSE, message)
+
+def debug(message):
+    emit(DEBUG, message)
+
+def confirm(question, assume_yes=False):
+    """
+    Asks a yes/no question; with 'assume_yes', answers it without prompting.
+    """
+    if assume_yes:
+        info(f"{question}yes (assumed)")
+        return True
+    return input(question).strip().lower() == "yes"
+
+def pause(assume_yes=False):
+    if not assume_yes:
+        input("\nPress Enter to exit...")
+
+def format_duration(seconds):
+    if seconds is None:
+        return "unknown"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+class Progress:
+    """
+    Live progress line of one loop: items done (out of 'total', if known),
+    failures, rate and ETA. On a terminal it is redrawn in place at most
+    every PROGRESS_REDRAW seconds; otherwise a plain line is printed every
+    PROGRESS_LOG_INTERVAL seconds. Not shown with QUIET.
+
+    'status', if given, returns extra text for the line (bytes sent,
+    concurrency, ...); 'eta', if given, returns the seconds left (or None),
+    replacing the estimate from the item rate. advance() may be called from
+    several threads, so parallel loops can share one line.
+    """
+
+    def __init__(self, label, total=None, status=None, eta=None):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.status = status
+        self.eta = eta
+        self.active = _state["verbosity"] >= NORMAL
+        self._tty = sys.stdout.isatty()
+        self._start = time.perf_counter()
+        self._last_draw = self._start
+        self._width = 0
+
+    def __enter__(self):
+        if self.active:
+            _state["live"] = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def advance(self, ok=True, count=1):
+        with _lock:
+            self.done += count
+            if not ok:
+                self.failed += count
+            self.draw()
+
+    def line(self, final=False):
+        elapsed = time.perf_counter() - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        parts = [f"{self.label}: {self.done}" + (f"/{self.total}" if self.total is not None else "")]
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        parts.append(f"{rate:.1f}/s")
+        if self.status is not None:
+            parts.append(self.status())
+        if final:
+            parts.append(f"took {format_duration(elapsed)}")
+        elif self.eta is not None:
+            parts.append(f"ETA {format_duration(self.eta())}")
+        elif self.total is not None and rate > 0:
+            parts.append(f"ETA {format_duration((self.total - self.done) / rate)}")
+        return ", ".join(parts)
+
+    def draw(self, force=False):
+        if not self.active:
+            return
+        now = time.perf_counter()
+        if self._tty:
+            if not force and now - self._last_draw < PROGRESS_REDRAW:
+                return
+            text = self.line()
+            sys.stdout.write("\r" + text.ljust(self._width))
+            sys.stdout.flush()
+            self._width = len(text)
+        elif not force and now - self._last_draw >= PROGRESS_LOG_INTERVAL:
+            print(self.line())
+        else:
+            return
+        self._last_draw = now
+
+    def clear(self):
+        if self._tty and self._width:
+            sys.stdout.write("\r" + " " * self._width + "\r")
+            self._width = 0
+
+    def close(self):
+        """
+        Leaves the final state of the line on screen (and in the log).
+        """
+        if _state["live"] is self:
+            _state["live"] = None
+        if not self.active:
+            return
+        self.clear()
+        self.active = False
+        info(self.line(final=True))
@@ -0,0 +1,153 @@
+import os
+import json
+import heapq
+from datetime import datetime, timezone
+import Report
+from Report import format_duration
+from Storage import write_atomic
+
+################################################################################
+# UPLOAD SCHEDULE
+################################################################################
+
+# Cast videos range from short clips to multi-GB recordings. Sent in folder
+# order, the last big one often ends up running alone while every other
+# worker is idle. Sending the largest first (longest-processing-time first)
+# lets the small ones fill the gaps around them, so all workers finish at
+# about the same time.
+#
+# Time estimates assume every upload in flight moves at the same rate, in
+# bytes/s per upload: the rate measured on the uploads completed so far in
+# this run, or, before any has completed, the one saved at the end of the
+# last run in BANDWIDTH_PATH:
+#
+#   {kind: {"bytes_per_s": per-upload rate, "measured": ISO time}}
+
+BANDWIDTH_PATH = os.path.join(os.path.expanduser("~"), ".datascripts", "upload_bandwidth.json")
+
+# Orders accepted by order_uploads.
+SCHEDULE_ORDERS = ("largest", "folder")
+
+def order_uploads(entries, order="largest", size_key="video_size"):
+    """
+    Returns 'entries' in the order they should be submitted: largest
+    'size_key' first, or unchanged (folder order). Equal sizes keep their
+    folder order.
+    """
+    if order not in SCHEDULE_ORDERS:
+        raise ValueError(f"Unknown upload order: {order!r}")
+    if order == "largest":
+        return sorted(entries, key=lambda entry: entry[size_key], reverse=True)
+    return list(entries)
+
+def estimate_makespan(sizes, lanes, bandwidth):
+    """
+    Seconds needed to send 'sizes' (bytes, in submission order) over 'lanes'
+    parallel uploads of 'bandwidth' bytes/s each, every upload starting on
+    the first lane to free up, as in a thread pool. None without a bandwidth.
+    """
+    if not bandwidth:
+        return None
+    free_at = [0.0] * max(1, min(int(lanes), len(sizes)))
+    for size in sizes:
+        heapq.heapreplace(free_at, free_at[0] + size / bandwidth)
+    return max(free_at)
+
+def format_bytes(count):
+    if count >= 1e9:
+        return f"{count / 1e9:.2f} GB"
+    return f"{count / 1e6:.1f} MB"
+
+def load_bandwidth(kind, path=BANDWIDTH_PATH):
+    """
+    Returns the per-upload rate (bytes/s) saved for 'kind', or None.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.loads(f.read())
+        rate = data[kind]["bytes_per_s"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return rate if isinstance(rate, (int, float)) and rate > 0 else None
+
+def save_bandwidth(kind, bytes_per_s, path=BANDWIDTH_PATH):
+    """
+    Saves the per-upload rate measured for 'kind'.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    data[kind] = {"bytes_per_s": bytes_per_s, "measured": datetime.now(timezone.utc).isoformat()}
+    write_atomic(path, json.dumps(data), "upload bandwidth")
+
+def print_upload_plan(item_name, folder_sizes, order, lanes, bandwidth, bandwidth_source):
+    """
+    Prints what an upload of 'folder_sizes' (bytes, in folder order) will
+    cost: count, total bytes, largest item and the estimated wall-clock time
+    over 'lanes' uploads in flight, in 'order' and in folder order.
+    """
+    scheduled = [entry["size"] for entry in order_uploads(
+        [{"size": size} for size in folder_sizes], order, size_key="size")]
+    Report.info(f"\nUPLOAD PLAN ({item_name}):")
+    Report.info(f"  To upload: {len(folder_sizes)}, {format_bytes(sum(folder_sizes))} in total")
+    if not folder_sizes:
+        return
+    Report.info(f"  Largest: {format_bytes(max(folder_sizes))}")
+    Report.info(f"  Uploads in flight: {lanes}, order: {order}")
+    if bandwidth is None:
+        Report.info("  Estimated time: unknown (no upload rate measured yet; pass a bandwidth to estimate)")
+        return
+    Report.info(f"  Upload rate: {bandwidth / 1e6:.2f} MB/s per upload ({bandwidth_source})")
+    Report.info(f"  Estimated time: {format_duration(estimate_makespan(scheduled, lanes, bandwidth))}"
+                + ("" if order == "folder" else
+                   f" (folder order: {format_duration(estimate_makespan(folder_sizes, lanes, bandwidth))})"))
+
+class UploadProgress:
+    """
+    Follows the uploads of one run, submitted in the order of 'sizes'
+    ({name: bytes}), and estimates the time left from the per-upload rate
+    measured on those completed so far ('bandwidth' until the first one
+    completes), for the progress line. Only touched by the thread handling
+    results.
+    """
+
+    def __init__(self, sizes, bandwidth=None):
+        self.pending = dict(sizes)
+        self.total = len(sizes)
+        self.total_bytes = sum(sizes.values())
+        self.done = 0
+        self.done_bytes = 0
+        self.bandwidth = bandwidth
+        self._sent_bytes = 0
+        self._busy = 0.0
+
+    def finish(self, name, seconds, ok):
+        """
+        Marks 'name' as finished, its upload having taken 'seconds' on the
+        wire (None if unknown). Only successful uploads count towards the
+        measured rate.
+        """
+        size = self.pending.pop(name, 0)
+        self.done += 1
+        self.done_bytes += size
+        if ok and seconds:
+            self._sent_bytes += size
+            self._busy += seconds
+            self.bandwidth = self._sent_bytes / self._busy
+
+    def measured(self):
+        """
+        The per-upload rate measured in this run, or None.
+        """
+        return self._sent_bytes / self._busy if self._busy else None
+
+    def eta(self, lanes):
+        # Uploads still in flight count as not started, so this errs long.
+        return estimate_makespan(list(self.pending.values()), lanes, self.bandwidth)
+
+    def describe(self):
+        return f"{format_bytes(self.done_bytes)} of {format_bytes(self.total_bytes)}"
@@ -0,0 +1,123 @@
+################################################################################
+# DECLARATIVE PAYLOAD SCHEMAS
+################################################################################
+
+# A schema is a mapping of field name -> Field. compile_schema() turns it, once,
+# into a validator function generated specifically for that schema: the key
+# sets, error messages and one inlined check per field are all fixed up front,
+# so validating a payload is a key-set comparison plus straight-line checks,
+# with no per-field function calls or lookups in the schema.
+#
+#   CAST_SCHEMA = compile_schema({"title": Field(str), "duration": Field(int, minimum=1)})
+#   errors = CAST_SCHEMA(payload)          # [] when valid
+#   all_errors = validate_batch(CAST_SCHEMA, payloads)
+
+class Field:
+    """
+    Describes one field of a payload.
+      - field_type: str, int, float or bool
+      - required:   the field must be present
+      - non_empty:  for str fields, the value must not be blank (default True)
+      - minimum / maximum: inclusive bounds for int and float fields
+    """
+
+    def __init__(self, field_type, required=True, non_empty=True, minimum=None, maximum=None):
+        if field_type not in (str, int, float, bool):
+            raise ValueError(f"Unsupported field type: {field_type!r}")
+        self.field_type = field_type
+        self.required = required
+        self.non_empty = non_empty
+        self.minimum = minimum
+        self.maximum = maximum
+
+def _field_check_source(index, name, field, namespace):
+    """
+    Returns the source lines checking field 'name' (already bound to local
+    'v'), registering the constants they use in 'namespace'.
+    """
+    def const(prefix, value):
+        key = f"{prefix}{index}"
+        namespace[key] = value
+        return key
+
+    field_type = field.field_type
+    if field_type is str:
+        if field.non_empty:
+            message = const("M", f"Field '{name}' is empty or not a string.")
+            return [f"if type(v) is not str or not v.strip(): errors.append({message})"]
+        message = const("M", f"Field '{name}' is not a string.")
+        return [f"if type(v) is not str: errors.append({message})"]
+
+    if field_type is bool:
+        message = const("M", f"Field '{name}' is not a boolean.")
+        return [f"if type(v) is not bool: errors.append({message})"]
+
+    # Numbers. bool is a subclass of int, so exact type checks exclude it.
+    if field_type is int:
+        type_test = "type(v) is not int"
+        message = const("M", f"Field '{name}' is not an integer.")
+    else:
+        type_test = "type(v) is not int and type(v) is not float"
+        message = const("M", f"Field '{name}' is not a number.")
+    lines = [f"if {type_test}: errors.append({message})"]
+    if field.minimum is not None:
+        bound = const("LO", field.minimum)
+        low = const("ML", f"Field '{name}' must be >= {field.minimum}.")
+        lines.append(f"elif v < {bound}: errors.append({low})")
+    if field.maximum is not None:
+        bound = const("HI", field.maximum)
+        high = const("MH", f"Field '{name}' must be <= {field.maximum}.")
+        lines.append(f"elif v > {bound}: errors.append({high})")
+    return lines
+
+def compile_schema(fields, allow_extra=False):
+    """
+    Compiles 'fields' ({name: Field}) into validate(payload) -> list of error
+    messages, empty when the payload is valid. Every problem is reported,
+    not just the first one. Unknown fields are errors unless 'allow_extra'.
+    """
+    fields = dict(fields)
+    known_keys = frozenset(fields)
+    required_keys = frozenset(name for name, field in fields.items() if field.required)
+    required_order = tuple(name for name in fields if name in required_keys)
+
+    def key_errors(payload):
+        # Slow path, only taken when the key set is not exactly the required one.
+        errors = []
+        extra_keys = [] if allow_extra else [k for k in payload if k not in known_keys]
+        missing_keys = [k for k in required_order if k not in payload]
+        if extra_keys:
+            errors.append(f"Extra field(s): {extra_keys}")
+        if missing_keys:
+            errors.append(f"Missing field(s): {missing_keys}")
+        return errors
+
+    namespace = {
+        "REQUIRED": required_keys,
+        "MISSING": object(),
+        "key_errors": key_errors,
+        "NOT_OBJECT": "Payload is not a JSON object.",
+    }
+    lines = [
+        "def validate(payload):",
+        "    if type(payload) is not dict:",
+        "        return [NOT_OBJECT]",
+        "    errors = [] if payload.keys() == REQUIRED else key_errors(payload)",
+    ]
+    for index, (name, field) in enumerate(fields.items()):
+        lines.append(f"    v = payload.get({name!r}, MISSING)")
+        lines.append("    if v is not MISSING:")
+        lines.extend("        " + line for line in _field_check_source(index, name, field, namespace))
+    lines.append("    return errors")
+
+    exec("\n".join(lines), namespace)
+    validate = namespace["validate"]
+    validate.fields = fields
+    return validate
+
+def validate_batch(validator, payloads):
+    """
+    Validates many payloads in one call. Returns one error list per payload,
+    in order (empty lists for valid payloads).
+    """
+    return [validator(payload) for payload in payloads]
@@ -0,0 +1,34 @@
+import os
+import uuid
+import Report
+
+################################################################################
+# LOCAL FILES
+################################################################################
+
+# The state kept between runs (content index, scan caches, upload bandwidth,
+# listing cache metadata) is only an optimisation: losing it costs time, not
+# correctness. It is always replaced whole through write_atomic, so a crash
+# or a concurrent run never leaves a half-written file behind, and a file
+# that cannot be written only costs a warning.
+
+def write_atomic(path, text, what):
+    """
+    Replaces 'path' with 'text' (creating its folder if needed) by writing a
+    temporary file next to it and renaming it over. Returns True on success;
+    otherwise warns that 'what' could not be written and returns False.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        Report.warning(f"Warning: could not write {what}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
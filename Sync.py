@@ -0,0 +1,227 @@
+import os
+import Creation
+from Client import ApiClient, DEFAULT_BASE_URL
+from Metrics import RunMetrics
+import Report
+from Report import confirm, pause
+from Purge import (ITEM_TYPES, ListingError, iter_items, delete_all, DEFAULT_DELETE_WORKERS,
+                   DEFAULT_DELETE_RATE)
+
+################################################################################
+# SYNC
+################################################################################
+
+# Reconciles one collection on the server with a local folder, instead of
+# purging everything and creating it all again. Local and remote items are
+# matched by a stable key; only local items missing on the server are
+# created and only server items with no local counterpart are deleted.
+# Matched items are never touched.
+
+# Fields forming the key of an item. Universities are keyed by name (the icon
+# file name without extension); casts and articles by title and university.
+# Keys compare case-insensitively and ignore surrounding whitespace.
+SYNC_KEYS = {
+    "university": ("name",),
+    "cast": ("title", "university"),
+    "article": ("title", "university"),
+}
+
+def item_key(kind, record):
+    """
+    Returns the key of 'record' (a payload or a listed item) as a tuple, or
+    None if one of its key fields is missing or not a string.
+    """
+    key = []
+    for field in SYNC_KEYS[kind]:
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        key.append(value.strip().casefold())
+    return tuple(key)
+
+def local_items(kind, folder_path, scan_processes=None):
+    """
+    Returns (items, invalid, conflicts): 'items' maps each key to the name of
+    the local file or folder it comes from; 'invalid' and 'conflicts' list
+    (name, reason) for local items that fail validation or reuse a key.
+    """
+    items = {}
+    invalid = []
+    conflicts = []
+    if kind == "university":
+        candidates = [(f, {"name": os.path.splitext(f)[0]}, None) for f in Creation.list_icon_files(folder_path)]
+    else:
+        if kind == "cast":
+            manifest = Creation.scan_cast_folder(folder_path, processes=scan_processes)
+        else:
+            manifest = Creation.scan_article_folder(folder_path, processes=scan_processes)
+        candidates = [(e["name"], e["payload"], None if e["valid"] else e["error"]) for e in manifest]
+
+    for name, payload, error in candidates:
+        if error is not None:
+            invalid.append((name, error))
+            continue
+        key = item_key(kind, payload)
+        if key in items:
+            conflicts.append((name, f"same key as '{items[key]}'"))
+            continue
+        items[key] = name
+    return items, invalid, conflicts
+
+def remote_items(client, kind, use_cache=False):
+    """
+    Streams the listing of 'kind' and returns (items, unkeyed): 'items' maps
+    each key to the (id, display value) of every server item carrying it, and
+    'unkeyed' counts items whose key fields are missing. Raises ListingError.
+    'use_cache' is passed on to Purge.iter_items.
+    """
+    _, id_field, display_field = ITEM_TYPES[kind]
+    items = {}
+    unkeyed = 0
+    for item in iter_items(client, f"{client.base_url}/{kind}", use_cache=use_cache):
+        if id_field not in item:
+            continue
+        key = item_key(kind, item)
+        if key is None:
+            unkeyed += 1
+            continue
+        display = item.get("title") or item.get(display_field, "(no value)")
+        items.setdefault(key, []).append((item[id_field], display))
+    return items, unkeyed
+
+def plan_sync(local, remote):
+    """
+    Compares local and remote items by key. Returns a dict with:
+      create:     local names whose key is not on the server
+      delete:     (id, display value) of server items with no local key,
+                  plus extra copies when the server holds a key twice
+      unchanged:  number of keys present on both sides
+    """
+    create = [name for key, name in local.items() if key not in remote]
+    delete = []
+    unchanged = 0
+    for key, copies in remote.items():
+        if key in local:
+            unchanged += 1
+            delete.extend(copies[1:])
+        else:
+            delete.extend(copies)
+    create.sort()
+    return {"create": create, "delete": delete, "unchanged": unchanged}
+
+def print_plan(item_name, plan, problems, unkeyed, delete_stale, dry_run=False):
+    # 'delete_stale' is False when deletes were turned off or held back. The
+    # items to create and delete are only listed in full for a dry run.
+    show = Report.info if dry_run else Report.item
+    Report.info(f"\nSYNC PLAN ({item_name}):")
+    Report.info(f"  Unchanged: {plan['unchanged']}")
+    Report.info(f"  To create: {len(plan['create'])}")
+    for name in plan["create"]:
+        show(f"    + {name}")
+    if delete_stale:
+        Report.info(f"  To delete: {len(plan['delete'])}")
+        for _, display in plan["delete"]:
+            show(f"    - {display}")
+    else:
+        Report.info(f"  Stale on the server (kept): {len(plan['delete'])}")
+    if problems:
+        Report.info(f"  Local items skipped: {len(problems)}")
+        for name, reason in problems:
+            Report.info(f"    ! {name}: {reason}")
+    if unkeyed:
+        Report.info(f"  Server items without a usable key (left alone): {unkeyed}")
+
+def sync_items(kind, folder_path, brightmindid="", dry_run=False, delete_stale=True,
+               workers=DEFAULT_DELETE_WORKERS, rate=DEFAULT_DELETE_RATE, scan_processes=None,
+               assume_yes=False, base_url=DEFAULT_BASE_URL, metrics_path=None, use_listing_cache=True):
+    """
+    Makes the server's 'kind' collection match 'folder_path' (laid out as for
+    the matching create_* function). Shows the plan, asks for confirmation,
+    then creates missing items through create_universities / create_casts /
+    create_articles and deletes stale ones through Purge.delete_all.
+
+    With 'dry_run' only the plan is shown; with delete_stale=False nothing is
+    deleted. Creates bypass the journal and content index, since the listing
+    has just shown those items are absent. Listing and delete metrics are
+    printed ('metrics_path' also saves them as JSON); the create step prints
+    its own. With 'use_listing_cache', an unchanged server collection is not
+    downloaded again (see ListingCache). Returns the number of failures, or None if nothing was attempted.
+    """
+    if kind not in SYNC_KEYS:
+        Report.error("Invalid item type.")
+        return
+    item_name = ITEM_TYPES[kind][0]
+
+    Report.info("\n" + "="*50)
+    Report.info(f"          {item_name.upper()} SYNC".center(50))
+    Report.info("="*50 + "\n")
+
+    metrics = RunMetrics(f"sync-{kind}")
+    with metrics.phase("scan"):
+        local, invalid, conflicts = local_items(kind, folder_path, scan_processes)
+
+    Report.info(f"Fetching all {item_name}...")
+    client = ApiClient(base_url, pool_size=1, metrics=metrics)
+    try:
+        with metrics.phase("list"):
+            remote, unkeyed = remote_items(client, kind, use_listing_cache)
+    except ListingError as e:
+        Report.error(f"Failed to fetch {item_name}. {e}")
+        return 1
+    finally:
+        client.close()
+
+    plan = plan_sync(local, remote)
+    if invalid and delete_stale and plan["delete"]:
+        # An invalid local item has no trustworthy key, so its server copy
+        # would look stale. Hold deletes back until the folder is fixed.
+        Report.info(f"\n{len(invalid)} local item(s) failed validation; stale {item_name} will not be deleted.")
+        delete_stale = False
+    print_plan(item_name, plan, invalid + conflicts, unkeyed, delete_stale, dry_run)
+
+    to_delete = plan["delete"] if delete_stale else []
+    if not plan["create"] and not to_delete:
+        Report.info(f"\n{item_name.capitalize()} are already in sync.")
+        return 0
+    if dry_run:
+        Report.info("\nDry run: nothing was changed.")
+        return 0
+    if not confirm("\nDo you want to apply this plan? (yes/no): ", assume_yes):
+        Report.info("\nAborting sync.")
+        return
+
+    failures = 0
+    create_failures = 0
+    names = set(plan["create"])
+    if names:
+        common = {"dedupe": False, "assume_yes": True, "base_url": base_url, "names": names}
+        if kind == "university":
+            created = Creation.create_universities(folder_path, **common)
+        elif kind == "cast":
+            created = Creation.create_casts(folder_path, brightmindid, scan_processes=scan_processes, **common)
+        else:
+            created = Creation.create_articles(folder_path, brightmindid, scan_processes=scan_processes, **common)
+        create_failures = created or 0
+        failures += create_failures
+
+    deleted = []
+    if to_delete:
+        Report.info(f"\nDeleting {len(to_delete)} stale {item_name}...")
+        with metrics.phase("delete"):
+            deleted, failed, gone = delete_all(f"{base_url}/{kind}", kind, to_delete, workers=workers, rate=rate,
+                                               metrics=metrics)
+        # Stale items someone else already deleted are just as gone.
+        deleted += gone
+        failures += len(failed)
+
+    Report.info(f"\nSYNC SUMMARY ({item_name}):")
+    Report.info(f"  Unchanged: {plan['unchanged']}")
+    Report.info(f"  Created: {len(names) - create_failures}")
+    Report.info(f"  Deleted: {len(deleted)}")
+    Report.info(f"  Failed: {failures}")
+    metrics.count("unchanged", plan["unchanged"])
+    metrics.count("deleted", len(deleted))
+    metrics.count("failed", failures)
+    metrics.report(metrics_path)
+    pause(assume_yes)
+    return failures
@@ -0,0 +1,421 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import Creation
+import Journal
+from Client import ApiClient, DEFAULT_BASE_URL
+from Metrics import RunMetrics
+from ContentIndex import load_index, save_index, find_duplicates, record_upload
+from ListingCache import invalidate_listing
+import Report
+
+################################################################################
+# WATCH MODE
+################################################################################
+
+# Long-running ingestion of a drop folder: instead of rerunning create_casts /
+# create_articles (and rescanning everything) by hand, new cast subfolders
+# and article files are validated and uploaded as soon as they are complete.
+#
+# Changes are picked up with inotify (through ctypes, Linux only), with a
+# watch on the folder and one on each cast subfolder, so only the item that
+# changed is looked at. Where inotify is unavailable, or with poll=True, the
+# top level of the folder is listed every 'poll_interval' seconds instead.
+#
+# An item is complete once it has settled: a cast subfolder holding
+# 'details.json' and one other file (the video), or an article file, whose
+# names, sizes and mtimes have not changed for 'settle' seconds. It is then
+# validated with the same scan functions as the batch commands, checked
+# against the journal, and uploaded on a small thread pool. Items that change
+# again later are looked at again; an unchanged fingerprint is never sent
+# twice.
+
+# Seconds an item must stay unchanged before it is taken as complete.
+DEFAULT_SETTLE_SECONDS = 5.0
+
+# Seconds between two listings of the folder in polling mode.
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Uploads running at once.
+DEFAULT_WATCH_WORKERS = 2
+
+# Article files picked up, as in create_articles.
+ARTICLE_EXTENSIONS = ('.txt', '.json')
+
+# inotify(7) constants.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """
+    Reports which top-level entries of 'folder_path' changed, using inotify.
+    Raises OSError if inotify cannot be used.
+    """
+
+    def __init__(self, folder_path):
+        libc_name = ctypes.util.find_library("c")
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError, TypeError):
+            raise OSError(errno.ENOSYS, "inotify is not available on this system")
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, f"inotify_init1 failed: {os.strerror(e)}")
+        self.folder_path = folder_path
+        self._names = {}  # watch descriptor -> top-level name ("" for the folder itself)
+        try:
+            self._watch(folder_path, "")
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _watch(self, path, name):
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, f"Cannot watch '{path}': {os.strerror(e)}")
+        self._names[wd] = name
+
+    def watch_subfolder(self, name):
+        # The subfolder may already be gone again; its removal is reported
+        # through the folder's own watch.
+        try:
+            self._watch(os.path.join(self.folder_path, name), name)
+        except OSError:
+            pass
+
+    def wait(self, timeout):
+        """
+        Waits up to 'timeout' seconds and returns the set of top-level names
+        that changed, or None if events were lost and everything must be
+        looked at again.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        changed = set()
+        if not readable:
+            return changed
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                top = self._names.get(wd)
+                if mask & IN_IGNORED:
+                    self._names.pop(wd, None)
+                elif top == "":
+                    if name:
+                        changed.add(os.fsdecode(name))
+                elif top is not None:
+                    changed.add(top)
+
+    def close(self):
+        os.close(self.fd)
+
+class PollWatcher:
+    """
+    Same interface as InotifyWatcher, listing the top level of the folder
+    every 'interval' seconds instead.
+    """
+
+    def __init__(self, folder_path, interval=DEFAULT_POLL_INTERVAL):
+        self.folder_path = folder_path
+        self.interval = interval
+        self._next_poll = time.monotonic()
+
+    def watch_subfolder(self, name):
+        pass
+
+    def wait(self, timeout):
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(0.0, timeout))
+            return set()
+        time.sleep(max(0.0, delay))
+        self._next_poll = time.monotonic() + self.interval
+        return None
+
+    def close(self):
+        pass
+
+def open_watcher(folder_path, poll=False, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Returns (watcher, description): inotify unless 'poll' is set or inotify
+    cannot be used, in which case the folder is polled.
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(folder_path), "inotify"
+        except OSError as e:
+            Report.warning(f"inotify unavailable ({e}); falling back to polling.")
+    return PollWatcher(folder_path, poll_interval), f"polling every {poll_interval:g} s"
+
+def list_candidates(kind, folder_path):
+    """
+    Names of the top-level entries that may be items of 'kind'. Dot-files
+    (editor temp files) are never candidates.
+    """
+    names = []
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if kind == "cast" and entry.is_dir():
+                names.append(entry.name)
+            elif kind == "article" and entry.name.lower().endswith(ARTICLE_EXTENSIONS):
+                names.append(entry.name)
+    return names
+
+def item_signature(kind, path):
+    """
+    What an item looks like on disk: names, sizes and mtimes of a cast
+    subfolder's files, or the size and mtime of an article file. None if
+    the item is gone or is not one of 'kind'.
+    """
+    try:
+        if kind == "article":
+            if not path.lower().endswith(ARTICLE_EXTENSIONS):
+                return None
+            st = os.stat(path)
+            return (st.st_size, st.st_mtime_ns) if os.path.isfile(path) else None
+        with os.scandir(path) as it:
+            return tuple(sorted((c.name, c.stat().st_size, c.stat().st_mtime_ns) for c in it))
+    except OSError:
+        return None
+
+def looks_complete(kind, signature):
+    """
+    Whether a settled item has everything it needs to be validated: a
+    non-empty article file, or 'details.json' plus exactly one other file.
+    """
+    if kind == "article":
+        return signature[0] > 0
+    return len(signature) == 2 and any(name.lower() == "details.json" for name, _, _ in signature)
+
+def upload_article(client, entry, brightmindid):
+    """
+    Article counterpart of Creation.upload_cast: returns
+    (name, ok, message, server_id, seconds) and touches no shared state.
+    """
+    name = entry["name"]
+    article_data = dict(entry["payload"])
+    article_data["brightmindid"] = brightmindid
+    try:
+        response = client.post_json("/article", article_data)
+    except Exception as e:
+        return name, False, f"Failed to send request for '{name}'. Error: {e}. Skipping...", None, None
+    if response.status_code == 201:
+        return (name, True, f"Successfully created article from file '{name}'.", Creation.created_id(response),
+                response.elapsed.total_seconds())
+    return name, False, (f"Failed to create article from file '{name}'. "
+                         f"Status code: {response.status_code}. Error detail: {response.text}"), None, None
+
+def watch_folder(kind, folder_path, brightmindid="", workers=DEFAULT_WATCH_WORKERS,
+                 settle=DEFAULT_SETTLE_SECONDS, poll=False, poll_interval=DEFAULT_POLL_INTERVAL, run_for=None,
+                 dedupe=True, base_url=DEFAULT_BASE_URL, metrics_path=None):
+    """
+    Watches 'folder_path' (laid out as for create_casts or create_articles,
+    'kind' being "cast" or "article") and uploads every item once it is
+    complete, until interrupted with Ctrl+C or, with 'run_for', after that
+    many seconds. Items already in the folder are picked up first; those
+    the journal lists as created are skipped. With 'dedupe', cast videos
+    already uploaded are skipped as in create_casts.
+
+    Uploads still running when the watch stops are waited for, then the
+    summary and run metrics are printed. Returns the number of failures.
+    """
+    if kind not in ("cast", "article"):
+        Report.error("Invalid item type.")
+        return
+    if not os.path.isdir(folder_path):
+        Report.error("Invalid folder path. Exiting.")
+        return
+    item_name = "casts" if kind == "cast" else "articles"
+
+    Report.info("\n" + "="*50)
+    Report.info(f"          {item_name.upper()} WATCH".center(50))
+    Report.info("="*50 + "\n")
+
+    watcher, how = open_watcher(folder_path, poll, poll_interval)
+    Report.info(f"Watching '{folder_path}' for new {item_name} ({how}, settle {settle:g} s). "
+                "Press Ctrl+C to stop.")
+
+    metrics = RunMetrics(f"watch-{kind}")
+    journal = Journal.load_journal(folder_path, kind)
+    journal_file = None
+    content_index = load_index() if dedupe and kind == "cast" else None
+    client = ApiClient(base_url, pool_size=workers, metrics=metrics)
+
+    counts = {"success": 0, "failed": 0, "already_created": 0, "duplicates": 0}
+    tracked = {}      # name -> [signature, time it last changed]
+    handled = {}      # name -> signature it was last processed with
+    watched = set()   # cast subfolders with an inotify watch
+    in_flight = {}    # future -> (name, fingerprint, video hash)
+
+    def observe(name):
+        path = os.path.join(folder_path, name)
+        if kind == "cast" and name not in watched and os.path.isdir(path):
+            # Watch first, then look, so no file added in between is missed.
+            watcher.watch_subfolder(name)
+            watched.add(name)
+        signature = item_signature(kind, path)
+        if signature is None:
+            tracked.pop(name, None)
+            handled.pop(name, None)
+            watched.discard(name)
+            return
+        if handled.get(name) == signature:
+            tracked.pop(name, None)
+            return
+        current = tracked.get(name)
+        if current is None or current[0] != signature:
+            tracked[name] = [signature, time.monotonic()]
+
+    def fail(name, fingerprint, message):
+        Report.error(message)
+        progress.advance(ok=False)
+        counts["failed"] += 1
+        Journal.record_journal(journal_file, kind, name, fingerprint, False, error=message)
+
+    def start(name, signature, executor):
+        # Validates a settled item and hands it to the pool.
+        handled[name] = signature
+        path = os.path.join(folder_path, name)
+        if kind == "cast":
+            entry, _ = Creation.scan_cast_subfolder(name, path)
+        else:
+            entry = Creation.scan_article_file(name, path)
+        entry.pop("timings")
+        if not entry["valid"]:
+            fail(name, None, f"Skipping '{name}' due to payload error: {entry['error']}")
+            return
+        if Journal.is_journaled_done(journal, name, entry["fingerprint"]):
+            Report.item(f"Skipping '{name}': already created in a previous run.")
+            counts["already_created"] += 1
+            return
+        video_hash = None
+        if content_index is not None:
+            hashes, duplicates = find_duplicates("cast", [(name, entry["video_path"])], content_index)
+            if name in duplicates:
+                Report.item(f"Skipping '{name}': {duplicates[name]}.")
+                counts["duplicates"] += 1
+                return
+            video_hash = hashes.get(name)
+        Report.item(f"Uploading '{name}'...")
+        upload = Creation.upload_cast if kind == "cast" else upload_article
+        future = executor.submit(upload, client, entry, brightmindid)
+        in_flight[future] = (name, entry["fingerprint"], video_hash)
+
+    def finish(future):
+        name, fingerprint, video_hash = in_flight.pop(future)
+        _, ok, message, server_id, _ = future.result()
+        if not ok:
+            fail(name, fingerprint, message)
+            return
+        Report.item(message)
+        progress.advance()
+        counts["success"] += 1
+        Journal.record_journal(journal_file, kind, name, fingerprint, True, server_id=server_id)
+        journal[name] = {"status": "done", "fingerprint": fingerprint}
+        if video_hash is not None:
+            record_upload(content_index, "cast", video_hash, server_id, name)
+            save_index(content_index)
+        invalidate_listing(f"{base_url}/{kind}")
+
+    def next_timeout():
+        # Wake up when the next item may have settled, and often enough to
+        # report finished uploads promptly.
+        timeout = 0.5 if in_flight else 5.0
+        now = time.monotonic()
+        busy = {name for name, _, _ in in_flight.values()}
+        for name, (signature, since) in tracked.items():
+            if name not in busy and looks_complete(kind, signature):
+                timeout = min(timeout, since + settle - now)
+        return max(0.05, timeout)
+
+    deadline = time.monotonic() + run_for if run_for else None
+    try:
+        journal_file = Journal.open_journal(folder_path)
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                Report.Progress(f"Watching for {item_name}") as progress:
+            try:
+                for name in list_candidates(kind, folder_path):
+                    observe(name)
+                while deadline is None or time.monotonic() < deadline:
+                    timeout = next_timeout()
+                    if deadline is not None:
+                        timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+                    changed = watcher.wait(timeout)
+                    if changed is None:
+                        changed = set(list_candidates(kind, folder_path)) | set(tracked)
+                    for name in changed:
+                        if not name.startswith("."):
+                            observe(name)
+
+                    now = time.monotonic()
+                    busy = {name for name, _, _ in in_flight.values()}
+                    for name, (signature, since) in list(tracked.items()):
+                        if name in busy or now - since < settle or not looks_complete(kind, signature):
+                            continue
+                        # Still the same as when it settled?
+                        observe(name)
+                        if tracked.get(name, [None])[0] == signature:
+                            del tracked[name]
+                            start(name, signature, executor)
+
+                    done = [future for future in in_flight if future.done()]
+                    for future in done:
+                        finish(future)
+            except KeyboardInterrupt:
+                Report.info("\nStopping the watch...")
+            if in_flight:
+                Report.info(f"Waiting for {len(in_flight)} upload(s) in flight...")
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+    finally:
+        watcher.close()
+        client.close()
+        Journal.close_journal(journal_file)
+
+    Report.info(f"\nWATCH SUMMARY ({item_name}):")
+    Report.info(f"  Success: {counts['success']}")
+    Report.info(f"  Failed: {counts['failed']}")
+    Report.info(f"  Already created (per the journal): {counts['already_created']}")
+    if kind == "cast":
+        Report.info(f"  Duplicates skipped: {counts['duplicates']}")
+    for name, amount in counts.items():
+        metrics.count(name, amount)
+    metrics.report(metrics_path)
+    return counts["failed"]
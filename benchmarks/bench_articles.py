@@ -0,0 +1,60 @@
+"""
+Measures article creation throughput against the local mock API, sending one
+request at a time versus the asyncio client with many requests in flight.
+
+    python benchmarks/bench_articles.py --files 2000 --latency 0.05 --concurrency 100
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Creation
+import Journal
+from datasets import make_article_folder
+from mock_server import start_mock_server
+
+def time_create(folder_path, base_url, async_mode, concurrency):
+    # Start from an empty journal so every article is sent again.
+    journal_path = Journal.journal_path(folder_path)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        failures = Creation.create_articles(folder_path, brightmindid="bench", assume_yes=True,
+                                            base_url=base_url, async_mode=async_mode,
+                                            concurrency=concurrency)
+    return time.perf_counter() - start, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds the mock server waits before answering each POST")
+    parser.add_argument("--concurrency", type=int, default=Creation.DEFAULT_ASYNC_CONCURRENCY)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(latency=args.latency)
+    try:
+        with tempfile.TemporaryDirectory() as folder_path:
+            print(f"Generating {args.files} article files...")
+            make_article_folder(folder_path, args.files)
+
+            serial, serial_failures = time_create(folder_path, base_url, False, 1)
+            concurrent, async_failures = time_create(folder_path, base_url, True, args.concurrency)
+            assert serial_failures == async_failures == 0
+
+            print(f"  sequential:       {serial:7.2f} s  ({args.files / serial:8.0f} articles/s)")
+            print(f"  async x{args.concurrency:<4}       {concurrent:7.2f} s  "
+                  f"({args.files / concurrent:8.0f} articles/s)")
+            print(f"  speedup:          {serial / concurrent:7.2f}x")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measures the article scan (read + json.loads + validate_article_payload) on a
+synthetic tree, in-process versus spread over a process pool.
+
+    python benchmarks/bench_scan.py --files 50000 --processes 8
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Creation
+from datasets import make_article_folder
+
+def time_scan(folder_path, processes):
+    start = time.perf_counter()
+    manifest = Creation.scan_article_folder(folder_path, use_cache=False, processes=processes)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(1 for e in manifest if e["valid"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--description-size", type=int, default=4096,
+                        help="bytes of description text per article")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder_path:
+        print(f"Generating {args.files} article files...")
+        make_article_folder(folder_path, args.files, args.description_size)
+
+        serial, valid_serial = time_scan(folder_path, processes=1)
+        parallel, valid_parallel = time_scan(folder_path, processes=args.processes)
+        assert valid_serial == valid_parallel == args.files
+
+        print(f"  1 process:   {serial:7.2f} s  ({args.files / serial:9.0f} files/s)")
+        print(f"  {args.processes} processes: {parallel:7.2f} s  ({args.files / parallel:9.0f} files/s)")
+        print(f"  speedup:     {serial / parallel:7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Microbenchmarks for payload validation: per-payload cost of the compiled
+schema validators, compared with the previous hand-written validator.
+
+    python benchmarks/bench_schema.py --payloads 100000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Schema import validate_batch
+import Creation
+
+LEGACY_REQUIRED_FIELDS_ARTICLE = [
+    "title", "department", "description", "university",
+    "category", "visibility", "link", "dateadded", "duration"
+]
+
+def legacy_validate_article_payload(payload):
+    """
+    The pre-schema validator (sets rebuilt per call, first error only),
+    extended with the same 'duration' check so both do the same work.
+    """
+    payload_keys = set(payload.keys())
+    required_keys = set(LEGACY_REQUIRED_FIELDS_ARTICLE)
+
+    extra_keys = payload_keys - required_keys
+    if extra_keys:
+        return False, f"Extra field(s): {list(extra_keys)}"
+
+    missing_keys = required_keys - payload_keys
+    if missing_keys:
+        return False, f"Missing field(s): {list(missing_keys)}"
+
+    for key in LEGACY_REQUIRED_FIELDS_ARTICLE:
+        val = payload[key]
+        if key == "duration":
+            if type(val) is not int or val < 1:
+                return False, "Field 'duration' must be a positive integer."
+        elif not isinstance(val, str) or not val.strip():
+            return False, f"Field '{key}' is empty or not a string."
+
+    return True, None
+
+def make_payloads(count, invalid_every):
+    payloads = []
+    for i in range(count):
+        payload = {
+            "title": f"Article {i}",
+            "department": "Physics",
+            "description": "An article about physics.",
+            "university": "UniversityofMelbourne",
+            "category": "Science",
+            "visibility": "public",
+            "link": f"https://example.org/articles/{i}",
+            "dateadded": "2024-01-01",
+            "duration": 5,
+        }
+        if invalid_every and i % invalid_every == 0:
+            payload["title"] = " "
+            del payload["duration"]
+        payloads.append(payload)
+    return payloads
+
+def bench(label, func, payloads, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payloads)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<34} {best / len(payloads) * 1e9:8.0f} ns/payload")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--payloads", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for title, invalid_every in (("All payloads valid:", 0), ("One payload in 10 invalid:", 10)):
+        payloads = make_payloads(args.payloads, invalid_every)
+        print(title)
+        bench("legacy validator (loop)", lambda ps: [legacy_validate_article_payload(p) for p in ps],
+              payloads, args.repeat)
+        bench("validate_article_payload (loop)", lambda ps: [Creation.validate_article_payload(p) for p in ps],
+              payloads, args.repeat)
+        bench("ARTICLE_SCHEMA (loop)", lambda ps: [Creation.ARTICLE_SCHEMA(p) for p in ps],
+              payloads, args.repeat)
+        bench("validate_batch(ARTICLE_SCHEMA)", lambda ps: validate_batch(Creation.ARTICLE_SCHEMA, ps),
+              payloads, args.repeat)
+
+if __name__ == "__main__":
+    main()
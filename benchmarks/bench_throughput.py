@@ -0,0 +1,176 @@
+"""
+End-to-end throughput of the creation and purge paths against the local mock
+API, at several dataset sizes. Reports items/s, MB/s uploaded and the peak
+RSS of the process running the path.
+
+    python benchmarks/bench_throughput.py --sizes 100,1000 --latency 0.02 --error-rate 0.01
+
+Each case runs in a fresh child process, so its peak RSS is its own and not
+that of the cases before it; the mock server runs in this process and does
+not count towards it. Children use a throwaway HOME, so the real content
+index is never touched.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import contextlib
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from datasets import make_icon_folder, make_cast_tree, make_article_folder, make_article_ndjson
+from mock_server import start_mock_server
+
+CASES = ("universities", "casts", "articles", "articles-async", "articles-ndjson", "purge")
+
+def run_case(case, folder_path, base_url, options):
+    """
+    Runs one path with its output discarded. Returns its failure count.
+    """
+    import Creation
+    import Purge
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if case == "universities":
+            return Creation.create_universities(folder_path, assume_yes=True, base_url=base_url)
+        if case == "casts":
+            return Creation.create_casts(folder_path, brightmindid="bench", workers=options["workers"],
+                                         assume_yes=True, base_url=base_url)
+        if case == "articles":
+            return Creation.create_articles(folder_path, brightmindid="bench", assume_yes=True,
+                                            base_url=base_url)
+        if case == "articles-async":
+            return Creation.create_articles(folder_path, brightmindid="bench", assume_yes=True,
+                                            base_url=base_url, async_mode=True,
+                                            concurrency=options["concurrency"])
+        if case == "articles-ndjson":
+            return Creation.create_articles(os.path.join(folder_path, "articles.ndjson"), brightmindid="bench",
+                                            assume_yes=True, base_url=base_url, async_mode=True,
+                                            concurrency=options["concurrency"])
+        if case == "purge":
+            return Purge.purge_items("cast", workers=options["workers"], rate=options["purge_rate"],
+                                     assume_yes=True, base_url=base_url)
+    raise ValueError(f"Unknown case: {case}")
+
+def child_main(case, folder_path, base_url, options):
+    # Runs in the child process; prints one JSON line for the parent.
+    start = time.perf_counter()
+    failures = run_case(case, folder_path, base_url, options)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"elapsed": elapsed, "failures": failures or 0, "peak_rss_kb": peak_kb}))
+
+def prepare_case(case, folder_path, size, server, args):
+    """
+    Generates the input of 'case' under 'folder_path' (or seeds the server
+    for a purge). Returns the number of items the case handles.
+    """
+    if case == "universities":
+        make_icon_folder(folder_path, size, args.icon_size)
+    elif case == "casts":
+        make_cast_tree(folder_path, size, args.video_size)
+    elif case in ("articles", "articles-async"):
+        make_article_folder(folder_path, size, args.description_size)
+    elif case == "articles-ndjson":
+        make_article_ndjson(os.path.join(folder_path, "articles.ndjson"), size, args.description_size)
+    elif case == "purge":
+        server.seed("cast", size)
+    return size
+
+def measure(case, size, server, base_url, args):
+    server.reset()
+    with tempfile.TemporaryDirectory() as work_dir:
+        folder_path = os.path.join(work_dir, "input")
+        os.makedirs(folder_path)
+        items = prepare_case(case, folder_path, size, server, args)
+
+        options = {"workers": args.workers, "concurrency": args.concurrency, "purge_rate": args.purge_rate}
+        env = dict(os.environ, HOME=work_dir)
+        command = [sys.executable, os.path.abspath(__file__), "--child", case,
+                   "--folder", folder_path, "--base-url", base_url, "--options", json.dumps(options)]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{case} x{size} failed:\n{completed.stderr}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    elapsed = result["elapsed"]
+    return {
+        "case": case,
+        "size": size,
+        "elapsed": elapsed,
+        "items_per_s": items / elapsed,
+        "mb_per_s": server.stats["bytes_in"] / elapsed / 1e6,
+        "peak_rss_mb": result["peak_rss_kb"] / 1024,
+        "failures": result["failures"],
+        "injected_errors": server.stats["errors"],
+    }
+
+def print_row(row):
+    print(f"  {row['case']:<15} {row['size']:>7}  {row['elapsed']:8.2f} s  {row['items_per_s']:9.1f} items/s  "
+          f"{row['mb_per_s']:8.2f} MB/s  {row['peak_rss_mb']:7.1f} MB RSS  "
+          f"{row['failures']} failed / {row['injected_errors']} injected")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000",
+                        help="comma-separated item counts to run every case at")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help=f"comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="seconds the mock server adds to every POST and DELETE")
+    parser.add_argument("--bandwidth", type=float, default=0,
+                        help="bytes/second per connection on the mock server (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of POSTs and DELETEs the mock server fails with a 503")
+    parser.add_argument("--video-size", type=int, default=256 * 1024)
+    parser.add_argument("--icon-size", type=int, default=16 * 1024)
+    parser.add_argument("--description-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=8,
+                        help="cast upload and delete threads")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="requests in flight for articles-async and articles-ndjson")
+    parser.add_argument("--purge-rate", type=float, default=0,
+                        help="deletes/second limit for purge (0 = unlimited)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--folder", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--options", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.folder, args.base_url, json.loads(args.options))
+        return
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    server, base_url = start_mock_server(latency=args.latency, bandwidth=args.bandwidth,
+                                         error_rate=args.error_rate)
+    print(f"Mock API at {base_url}: latency {args.latency}s, "
+          f"bandwidth {args.bandwidth or 'unlimited'}, error rate {args.error_rate}")
+    rows = []
+    try:
+        for size in sizes:
+            for case in cases:
+                row = measure(case, size, server, base_url, args)
+                print_row(row)
+                rows.append(row)
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
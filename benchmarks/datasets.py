@@ -0,0 +1,106 @@
+"""
+Synthetic input folders for the benchmarks, laid out the way the creation
+scripts expect them:
+  - make_icon_folder:    one image per university
+  - make_cast_tree:      one subfolder per cast with details.json and a video
+  - make_article_folder: one JSON file per article
+  - make_article_ndjson: one NDJSON file, one article per line
+
+Every generated icon and video has distinct content, so content-hash
+deduplication does not skip any of them.
+"""
+import os
+import json
+
+# Filler repeated to build file bodies; building them from a block is much
+# faster than os.urandom for multi-megabyte videos.
+FILLER_BLOCK = bytes(range(256)) * 256
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def write_unique_file(path, header, size):
+    """
+    Writes 'size' bytes to 'path': 'header' followed by filler.
+    """
+    with open(path, 'wb') as f:
+        f.write(header[:size])
+        remaining = size - len(header)
+        while remaining > 0:
+            chunk = FILLER_BLOCK[:remaining]
+            f.write(chunk)
+            remaining -= len(chunk)
+
+def make_icon_folder(folder_path, count, icon_size=16 * 1024):
+    """
+    Creates 'count' fake PNG icons of 'icon_size' bytes. Returns total bytes.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    for i in range(count):
+        header = PNG_SIGNATURE + f"icon {i}".encode("ascii")
+        write_unique_file(os.path.join(folder_path, f"University{i:06d}.png"), header, icon_size)
+    return count * icon_size
+
+def make_cast_tree(folder_path, count, video_size=1024 * 1024):
+    """
+    Creates 'count' cast subfolders, each with a valid details.json and a
+    fake video of 'video_size' bytes. Returns total video bytes.
+    """
+    for i in range(count):
+        cast_path = os.path.join(folder_path, f"cast_{i:06d}")
+        os.makedirs(cast_path, exist_ok=True)
+        details = {
+            "title": f"Cast {i}",
+            "department": "Physics",
+            "university": "UniversityofMelbourne",
+            "category": "Science",
+            "visibility": "public",
+            "link": f"https://example.org/casts/{i}",
+            "dateadded": "2024-01-01"
+        }
+        with open(os.path.join(cast_path, "details.json"), 'w', encoding='utf-8') as f:
+            json.dump(details, f)
+        header = b"\x00\x00\x00\x18ftypmp42" + f"cast {i}".encode("ascii")
+        write_unique_file(os.path.join(cast_path, "video.mp4"), header, video_size)
+    return count * video_size
+
+def make_article(i, description):
+    return {
+        "title": f"Article {i}",
+        "department": "Physics",
+        "description": description,
+        "university": "UniversityofMelbourne",
+        "category": "Science",
+        "visibility": "public",
+        "link": f"https://example.org/articles/{i}",
+        "dateadded": "2024-01-01",
+        "duration": 60
+    }
+
+def make_article_folder(folder_path, count, description_size=256):
+    """
+    Creates 'count' valid article JSON files with a description of
+    'description_size' bytes. Returns total bytes written.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    description = ("lorem ipsum " * (description_size // 12 + 1))[:description_size]
+    total = 0
+    for i in range(count):
+        data = json.dumps(make_article(i, description)).encode("utf-8")
+        with open(os.path.join(folder_path, f"article_{i:06d}.json"), 'wb') as f:
+            f.write(data)
+        total += len(data)
+    return total
+
+def make_article_ndjson(path, count, description_size=256):
+    """
+    Writes 'count' valid articles to 'path', one JSON object per line.
+    Returns total bytes written.
+    """
+    description = ("lorem ipsum " * (description_size // 12 + 1))[:description_size]
+    total = 0
+    with open(path, 'wb') as f:
+        for i in range(count):
+            data = json.dumps(make_article(i, description)).encode("utf-8") + b"\n"
+            f.write(data)
+            total += len(data)
+    return total
@@ -0,0 +1,314 @@
+"""
+Local stand-in for the backend API, for benchmarks and dry runs.
+
+Serves the endpoints the scripts use (POST /<type>, GET /<type>,
+DELETE /<type>/<id>) from an in-memory store. Write requests can be slowed
+down and made to fail, so client throughput can be measured without a real
+server:
+  - latency:    seconds added to every POST and DELETE
+  - bandwidth:  bytes/second each connection transfers bodies at (0 = unlimited)
+  - error_rate: fraction of POSTs and DELETEs answered with a retryable 503
+Listing pages carry an ETag and honour If-None-Match (304) unless the server
+is started with validators=False / --no-validators.
+
+With --replicas N, N servers sharing one store listen on consecutive ports,
+standing in for a replicated backend; --failing K makes the last K of them
+answer every request with a 503 (for --fail-for seconds, or for good).
+
+    python benchmarks/mock_server.py --port 8765 --latency 0.05 --bandwidth 10e6 --error-rate 0.01
+    python benchmarks/mock_server.py --port 8765 --replicas 3 --failing 1 --fail-for 20
+"""
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ITEM_TYPES = ("university", "cast", "article", "user")
+
+# Items per page of a GET listing; further pages are linked with rel="next".
+PAGE_SIZE = 100
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.throttle(len(data))
+        self.wfile.write(data)
+
+    def throttle(self, size):
+        # Time 'size' bytes would take over a link of the configured bandwidth.
+        if self.server.bandwidth:
+            time.sleep(size / self.server.bandwidth)
+
+    def fail_randomly(self):
+        """
+        Answers with a retryable 503 for a share of requests (error_rate), or
+        for all of them while the server is marked as failing. Returns True
+        if it did.
+        """
+        if time.monotonic() < self.server.failing_until:
+            self.server.count("errors")
+            self.send_json(503, {"error": "replica down"})
+            return True
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self.server.count("errors")
+            self.send_json(503, {"error": "injected failure"}, {"Retry-After": "0"})
+            return True
+        return False
+
+    def read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def received(self, body):
+        with self.server.lock:
+            self.server.served += 1
+        self.server.count("requests")
+        self.server.count("bytes_in", len(body))
+        self.throttle(len(body))
+
+    def split_path(self):
+        path, _, query = self.path.partition("?")
+        parts = [p for p in path.split("/") if p]
+        params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+        return parts, params
+
+    def do_GET(self):
+        parts, params = self.split_path()
+        self.received(b"")
+        if time.monotonic() < self.server.failing_until:
+            return self.fail_randomly()
+        if len(parts) != 1 or parts[0] not in ITEM_TYPES:
+            return self.send_json(404, {"error": "not found"})
+        store = self.server.store[parts[0]]
+        with self.server.lock:
+            items = list(store.values())
+            version = self.server.versions[parts[0]]
+        page = int(params.get("page") or 0)
+        headers = {}
+        if self.server.validators:
+            etag = f'"{parts[0]}-{version}-{page}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        if (page + 1) * PAGE_SIZE < len(items):
+            headers["Link"] = f'<http://{self.headers["Host"]}/{parts[0]}?page={page + 1}>; rel="next"'
+        self.send_json(200, items[page * PAGE_SIZE:(page + 1) * PAGE_SIZE], headers)
+
+    def do_POST(self):
+        parts, _ = self.split_path()
+        body = self.read_body()
+        self.received(body)
+        time.sleep(self.server.latency)
+        if self.fail_randomly():
+            return
+        if len(parts) != 1 or parts[0] not in ITEM_TYPES:
+            return self.send_json(404, {"error": "not found"})
+        fields = payload_fields(self.headers.get("Content-Type", ""), body)
+        self.send_json(201, self.server.add_item(parts[0], len(body), fields))
+
+    def do_DELETE(self):
+        parts, _ = self.split_path()
+        self.received(self.read_body())
+        time.sleep(self.server.latency)
+        if self.fail_randomly():
+            return
+        if len(parts) != 2 or parts[0] not in ITEM_TYPES:
+            return self.send_json(404, {"error": "not found"})
+        with self.server.lock:
+            found = parts[1] not in self.server.orphans and self.server.store[parts[0]].pop(parts[1], None)
+            self.server.versions[parts[0]] += 1
+        self.send_json(200 if found else 404, {})
+
+def payload_fields(content_type, body):
+    """
+    The JSON object sent with a create: the whole body for application/json,
+    or the application/json part of a multipart upload. {} if there is none.
+    """
+    if content_type.startswith("application/json"):
+        candidates = [body]
+    elif content_type.startswith("multipart/form-data") and "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].strip('"').encode("latin-1")
+        candidates = []
+        for part in body.split(b"--" + boundary):
+            head, _, value = part.partition(b"\r\n\r\n")
+            if b"application/json" in head:
+                candidates.append(value[:-2] if value.endswith(b"\r\n") else value)
+    else:
+        return {}
+    for candidate in candidates:
+        try:
+            fields = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(fields, dict):
+            return fields
+    return {}
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, latency=0.0, bandwidth=0, error_rate=0.0, validators=True):
+        super().__init__(address, MockHandler)
+        self.validators = validators
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.store = {item_type: {} for item_type in ITEM_TYPES}
+        self.versions = {item_type: 0 for item_type in ITEM_TYPES}
+        self.stats = {"requests": 0, "errors": 0, "bytes_in": 0}
+        # Ids still listed that answer 404 to a DELETE (see add_orphan).
+        self.orphans = set()
+        # Requests this server handled itself, and until when (monotonic
+        # time) it answers everything with a 503.
+        self.served = 0
+        self.failing_until = 0.0
+
+    def share_store(self, other):
+        """
+        Serves the same items and stats as 'other', as a replica of it.
+        """
+        self.lock = other.lock
+        self.store = other.store
+        self.orphans = other.orphans
+        self.versions = other.versions
+        self.stats = other.stats
+
+    def fail_for(self, seconds=None):
+        """
+        Answers every request with a 503 for 'seconds' (None: until told
+        otherwise with fail_for(0)).
+        """
+        self.failing_until = float("inf") if seconds is None else time.monotonic() + seconds
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def add_item(self, item_type, size=0, fields=None):
+        item_id = uuid.uuid4().hex
+        item = {"_id": item_id, "title": item_id, "username": item_id,
+                "displayedName": item_id, "size": size}
+        item.update(fields or {})
+        with self.lock:
+            self.store[item_type][item_id] = item
+            self.versions[item_type] += 1
+        return item
+
+    def add_orphan(self, item_type):
+        """
+        Adds an item that stays in the listing but answers 404 to a DELETE,
+        like one a lagging listing or replica still shows.
+        """
+        item = self.add_item(item_type)
+        with self.lock:
+            self.orphans.add(item["_id"])
+        return item
+
+    def seed(self, item_type, count):
+        """
+        Adds 'count' items of 'item_type', e.g. for a purge to delete.
+        """
+        for _ in range(count):
+            self.add_item(item_type)
+
+    def reset(self):
+        with self.lock:
+            for items in self.store.values():
+                items.clear()
+            self.orphans.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+def start_mock_server(port=0, latency=0.0, bandwidth=0, error_rate=0.0, validators=True):
+    """
+    Starts a MockServer on 127.0.0.1 in a background thread.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    server = MockServer(("127.0.0.1", port), latency=latency, bandwidth=bandwidth,
+                        error_rate=error_rate, validators=validators)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def start_mock_replicas(count, port=0, **options):
+    """
+    Starts 'count' MockServers sharing one store (see start_mock_server for
+    'options'), on consecutive ports from 'port' if given. Returns (servers,
+    base_urls); call shutdown() on each server when done.
+    """
+    servers = []
+    base_urls = []
+    for i in range(count):
+        server, base_url = start_mock_server(port + i if port else 0, **options)
+        if servers:
+            server.share_store(servers[0])
+        servers.append(server)
+        base_urls.append(base_url)
+    return servers, base_urls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every POST and DELETE")
+    parser.add_argument("--bandwidth", type=float, default=0,
+                        help="bytes/second per connection for request and response bodies (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of POSTs and DELETEs answered with a 503")
+    parser.add_argument("--no-validators", action="store_true",
+                        help="send listings without ETag, so clients fall back to their TTL")
+    parser.add_argument("--replicas", type=int, default=1,
+                        help="servers sharing one store, on consecutive ports from --port")
+    parser.add_argument("--failing", type=int, default=0,
+                        help="answer every request with a 503 on the last N replicas")
+    parser.add_argument("--fail-for", type=float, default=0,
+                        help="seconds the --failing replicas stay down (0 = for good)")
+    args = parser.parse_args()
+    servers, base_urls = start_mock_replicas(max(1, args.replicas), args.port, latency=args.latency,
+                                             bandwidth=args.bandwidth, error_rate=args.error_rate,
+                                             validators=not args.no_validators)
+    for server in servers[len(servers) - args.failing:] if args.failing else []:
+        server.fail_for(args.fail_for or None)
+    print(f"Mock API listening on {','.join(base_urls)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    for base_url, server in zip(base_urls, servers):
+        print(f"{base_url}: {server.served} request(s)")
+        server.shutdown()
+
+if __name__ == "__main__":
+    sys.exit(main())
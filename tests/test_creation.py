@@ -0,0 +1,94 @@
+"""
+Tests of the cast and article folder scans (Creation.scan_cast_folder,
+Creation.scan_article_folder), their scan cache, and the journal.
+
+    python -m pytest tests
+"""
+import os
+import io
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import Creation
+from Creation import scan_cast_folder, scan_article_folder, created_id
+from Journal import record_journal
+from datasets import make_cast_tree, make_article_folder
+
+class ScanCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        make_cast_tree(os.path.join(self.root, "casts"), 3, video_size=1024)
+        make_article_folder(os.path.join(self.root, "articles"), 3)
+        self.addCleanup(os.chdir, os.getcwd())
+        patcher = mock.patch.object(Creation, "SCAN_CACHE_DIR", os.path.join(self.root, "scan_cache"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scan_twice(self, scan, folder_name):
+        # Fill the cache through a relative path, then read it back through
+        # the absolute path from another working directory.
+        os.chdir(self.root)
+        scan(folder_name, processes=1)
+        os.chdir(os.sep)
+        folder_path = os.path.join(self.root, folder_name)
+        return scan(folder_path, processes=1), scan(folder_path, use_cache=False, processes=1)
+
+    def test_cached_cast_paths_follow_the_folder(self):
+        cached, scanned = self.scan_twice(scan_cast_folder, "casts")
+        self.assertEqual(cached, scanned)
+        for entry in cached:
+            self.assertTrue(entry["valid"], entry["error"])
+            self.assertTrue(os.path.isfile(entry["json_path"]))
+            self.assertTrue(os.path.isfile(entry["video_path"]))
+
+    def test_cached_article_paths_follow_the_folder(self):
+        cached, scanned = self.scan_twice(scan_article_folder, "articles")
+        self.assertEqual(cached, scanned)
+        for entry in cached:
+            self.assertTrue(entry["valid"], entry["error"])
+            self.assertTrue(os.path.isfile(entry["path"]))
+
+    def test_cache_is_kept_out_of_the_folder(self):
+        folder_path = os.path.join(self.root, "articles")
+        before = sorted(os.listdir(folder_path))
+        scan_article_folder(folder_path, processes=1)
+        self.assertEqual(sorted(os.listdir(folder_path)), before)
+        self.assertTrue(os.path.isfile(Creation.scan_cache_path(folder_path)))
+
+class FakeResponse:
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+class JournalTest(unittest.TestCase):
+
+    def test_created_id_needs_a_string(self):
+        self.assertEqual(created_id(FakeResponse('{"_id": "abc"}')), "abc")
+        for body in ('{"_id": null}', '{"_id": ""}', '{"_id": 7}', '{}', '[]', 'oops'):
+            with self.subTest(body=body):
+                self.assertIsNone(created_id(FakeResponse(body)))
+
+    def test_success_without_id_is_not_journaled(self):
+        # A purge could never clear such an entry.
+        journal_file = io.StringIO()
+        record_journal(journal_file, "cast", "a", "f1", True, server_id=None)
+        self.assertEqual(journal_file.getvalue(), "")
+        record_journal(journal_file, "cast", "b", "f2", False, error="boom")
+        record_journal(journal_file, "cast", "c", "f3", True, server_id="x")
+        self.assertEqual([json.loads(line)["key"] for line in journal_file.getvalue().splitlines()], ["b", "c"])
+
+if __name__ == "__main__":
+    unittest.main()
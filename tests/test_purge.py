@@ -0,0 +1,88 @@
+"""
+Tests of the streaming listing parser (Purge.iter_json_array) and of
+purge_items against the local mock API.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import json
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import Purge
+from Purge import ListingError, iter_json_array, purge_items
+from mock_server import start_mock_server
+
+def parse(*chunks):
+    return list(iter_json_array(chunk.encode("utf-8") for chunk in chunks))
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def test_every_split_point(self):
+        # Splitting the body anywhere must not change what is parsed.
+        text = '[3.5e10, -12, 0.25, "a,]", {"_id": "x", "n": [1, 2]}, true, null, 1E-3, 7]'
+        expected = json.loads(text)
+        for i in range(len(text) + 1):
+            with self.subTest(split=i):
+                self.assertEqual(parse(text[:i], text[i:]), expected)
+
+    def test_number_split_after_dot_or_exponent(self):
+        self.assertEqual(parse("[3", ".5e10]"), [3.5e10])
+        self.assertEqual(parse("[3.", "5]"), [3.5])
+        self.assertEqual(parse("[3e", "+2]"), [300.0])
+        self.assertEqual(parse("[1", "2", "3]"), [123])
+
+    def test_one_byte_chunks(self):
+        text = '[{"_id": "é"}, 42, 6.02e23]'
+        self.assertEqual(list(iter_json_array(bytes([b]) for b in text.encode("utf-8"))), json.loads(text))
+
+    def test_trailing_comma_is_rejected(self):
+        for chunks in (["[1,]"], ["[1,", "]"], ["[1, ]"], ['[{"a": 1},', ' ]']):
+            with self.subTest(chunks=chunks), self.assertRaises(ListingError):
+                parse(*chunks)
+
+    def test_malformed_scalar_is_rejected(self):
+        for chunks in (["[3.]"], ["[3.", "]"], ["[truex]"], ["[1 2]"]):
+            with self.subTest(chunks=chunks), self.assertRaises(ListingError):
+                parse(*chunks)
+
+    def test_empty_and_truncated(self):
+        self.assertEqual(parse("[", " ]"), [])
+        with self.assertRaises(ListingError):
+            parse("[1, 2")
+        with self.assertRaises(ListingError):
+            parse('{"a": 1}')
+
+class PurgeItemsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server, self.base_url = start_mock_server()
+        self.addCleanup(self.server.shutdown)
+
+    def test_pipeline_stops_on_items_that_answer_404(self):
+        # An item still listed but already gone must not make every pass
+        # look like it deleted something.
+        self.server.seed("cast", 5)
+        self.server.add_orphan("cast")
+        calls = []
+        real_delete_all = Purge.delete_all
+
+        def delete_all(*args, **kwargs):
+            calls.append(1)
+            if len(calls) > 10:
+                raise AssertionError("purge_items kept listing again")
+            return real_delete_all(*args, **kwargs)
+
+        with mock.patch.object(Purge, "delete_all", delete_all):
+            failures = purge_items("cast", pipeline=True, assume_yes=True, base_url=self.base_url,
+                                   use_listing_cache=False)
+        self.assertEqual(failures, 0)
+        self.assertEqual(len(self.server.store["cast"]), 1)
+
+if __name__ == "__main__":
+    unittest.main()